@@ -0,0 +1,38 @@
+"""Compares the Ogg CRC engine with the old byte by byte loop.
+
+Usage: python benchmarks/crc.py [size in bytes]
+"""
+
+import os
+import sys
+import timeit
+
+from pytag.crc import OggCRC
+from pytag.constants import CRC_LOOKUP
+
+
+def loop_crc(data):
+    crc_reg = 0
+    for value in data:
+        crc_reg = ((crc_reg << 8) ^
+                   CRC_LOOKUP[((crc_reg >> 24) & 0xff) ^ value]) & 0xFFFFFFFF
+    return crc_reg
+
+
+def main(size):
+    data = os.urandom(size)
+    assert loop_crc(data) == OggCRC(data).value
+
+    number = 5
+    old = min(timeit.repeat(lambda: loop_crc(data), number=number, repeat=3))
+    new = min(timeit.repeat(lambda: OggCRC(data).value, number=number,
+                            repeat=3))
+
+    mb = size * number / 2 ** 20
+    print('loop:   {:10.2f} MB/s'.format(mb / old))
+    print('OggCRC: {:10.2f} MB/s'.format(mb / new))
+    print('speedup: {:.0f}x'.format(old / new))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2 ** 20)
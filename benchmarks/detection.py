@@ -0,0 +1,64 @@
+"""Compares the per file detection cost of opening a libmagic handle for
+every file (as ``AudioReader`` used to do), reusing the handles of
+``pytag.detection.magic_pool``, and the signature detection.
+
+Usage: python benchmarks/detection.py [number of files]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+import magic
+
+from pytag import detection
+
+
+def create_files(folder, count):
+    # Half of the files are mp3 (signature detected), half unknown
+    paths = []
+    for index in range(count):
+        path = os.path.join(folder, '{}.dat'.format(index))
+        with open(path, 'wb') as f:
+            if index % 2:
+                f.write(b'\xff\xfb\x90\x64' + bytes(1000))
+            else:
+                f.write('file {}\n'.format(index).encode())
+        paths.append(path)
+    return paths
+
+
+def magic_per_file(path):
+    with magic.Magic(flags=magic.MAGIC_MIME_TYPE) as m:
+        return m.id_filename(path)
+
+
+def pooled_magic(path):
+    with detection.magic_pool.handle() as m:
+        return m.id_filename(path)
+
+
+def measure(function, paths):
+    start = time.perf_counter()
+    for path in paths:
+        function(path)
+    return (time.perf_counter() - start) / len(paths)
+
+
+def main(count):
+    folder = tempfile.mkdtemp()
+    try:
+        paths = create_files(folder, count)
+        for name, function in (('magic per file', magic_per_file),
+                               ('pooled magic', pooled_magic),
+                               ('detect_file', detection.detect_file)):
+            print('{:15} {:10.1f} us/file'.format(
+                name, measure(function, paths) * 1e6))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
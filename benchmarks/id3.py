@@ -0,0 +1,72 @@
+"""Compares the ID3v2 frame dispatch table with the old ``tuple.index``
+lookups, decoding a tag with hundreds of frames.
+
+Usage: python benchmarks/id3.py [number of frames]
+"""
+
+import sys
+import timeit
+
+from pytag.formats import Mp3Reader
+from pytag.constants import (ID3_ENCODINGS, FIELD_NAMES, TAG_ID3_V22,
+                             TAG_ID3_V23, TAG_ID3_V24)
+
+
+def old_read_frame(reader, frame_id, data, id3_type):
+    # Mp3Reader._read_id3_generic_frame and as_field before the dispatch
+    # tables, with the log message formatted for every frame
+    if not data:
+        return None
+    ' Found frame: "{}" for id3 version 2.{}'.format(frame_id, id3_type)
+    try:
+        id3 = {2: TAG_ID3_V22, 3: TAG_ID3_V23, 4: TAG_ID3_V24}[id3_type]
+        field_name = FIELD_NAMES[id3.index(frame_id.decode())]
+        data = bytes(data[1:]).decode(ID3_ENCODINGS[data[0]])
+    except (ValueError, IndexError):
+        return None
+    if field_name == 'date':
+        data = data[:4]
+    return {field_name: data}
+
+
+def make_frames(count):
+    # Mix of supported text frames and not supported frames
+    frame_ids = [frame_id.encode() for frame_id in TAG_ID3_V24
+                 if frame_id != 'TCON']
+    frame_ids += [b'TXXX', b'PRIV', b'COMM', b'TENC', b'WXXX']
+    frames = []
+    for index in range(count):
+        frame_id = frame_ids[index % len(frame_ids)]
+        frames.append((frame_id, memoryview(b'\x03' + b'value %d' % index)))
+    return frames
+
+
+def main(count):
+    frames = make_frames(count)
+    reader = Mp3Reader(None)
+
+    def old():
+        for frame_id, data in frames:
+            old_read_frame(reader, frame_id, data, 4)
+
+    def new():
+        for frame_id, data in frames:
+            reader._read_id3_generic_frame(frame_id, data, 4)
+
+    for frame_id, data in frames:
+        assert (old_read_frame(reader, frame_id, data, 4) ==
+                reader._read_id3_generic_frame(frame_id, data, 4))
+
+    number = 100
+    old_time = min(timeit.repeat(old, number=number, repeat=3))
+    new_time = min(timeit.repeat(new, number=number, repeat=3))
+
+    print('tuple.index: {:8.3f} us/frame'.format(
+        old_time / number / count * 1e6))
+    print('dispatch:    {:8.3f} us/frame'.format(
+        new_time / number / count * 1e6))
+    print('speedup: {:.1f}x'.format(old_time / new_time))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
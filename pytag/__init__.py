@@ -5,4 +5,5 @@ __version__ = pkg_resources.get_distribution('pytag').version
 
 # high level interface
 from pytag.interface import (Audio, AudioReader,       # flake8: noqa
-                             FormatNotSupportedError)
+                             FormatNotSupportedError, aread)
+from pytag.batch import read_many, scan, ReadResult      # flake8: noqa
@@ -0,0 +1,75 @@
+"""asyncio support. The blocking calls (open, read and write the files) are
+run in an executor, so they don't block the event loop, and the number of
+calls running at the same time is limited with a semaphore.
+"""
+
+import asyncio
+import functools
+import weakref
+
+
+class AsyncRunner:
+    """Runs blocking functions in an executor from coroutines, with at most
+    ``limit`` of them running at the same time (for every event loop).
+
+    A cancelled coroutine doesn't stop the function if it is already
+    running: it runs until the end (so files are never left half written,
+    and temporary files are removed if the function fails), and its slot is
+    released only then, so the limit is always honoured.
+
+    :param executor: A :py:class:`concurrent.futures.Executor`, ``None`` to
+        use the default executor of the event loop.
+    :param limit: Maximum number of functions running at the same time.
+    """
+
+    def __init__(self, executor=None, limit=32):
+        self.executor = executor
+        self.limit = limit
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self, loop):
+        # Semaphores can only be used by the loop where they were created
+        try:
+            return self._semaphores[loop]
+        except KeyError:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+            return semaphore
+
+    async def run(self, function, *args, **kwargs):
+        """Runs ``function(*args, **kwargs)`` in the executor.
+
+        :returns: The value returned by the function.
+        """
+
+        loop = asyncio.get_event_loop()
+        semaphore = self._semaphore(loop)
+        await semaphore.acquire()
+
+        try:
+            future = loop.run_in_executor(
+                self.executor, functools.partial(function, *args, **kwargs))
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def done(future):
+            semaphore.release()
+            if not future.cancelled():
+                future.exception()  # Nobody waits for it if cancelled
+
+        future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+
+#: Runner used by :py:func:`pytag.aread` and the coroutine methods of
+#: :py:class:`pytag.AudioReader` and :py:class:`pytag.Audio`.
+default_runner = AsyncRunner()
+
+
+def configure(executor=None, limit=32):
+    """Changes the executor and the concurrency limit of
+    :py:data:`default_runner`.
+    """
+
+    global default_runner
+    default_runner = AsyncRunner(executor, limit)
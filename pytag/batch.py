@@ -0,0 +1,253 @@
+"""Read the tags of many files at once."""
+
+import collections
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from pytag import detection
+from pytag.interface import AudioReader, MIMETYPE
+
+
+log = logging.getLogger('pytag')
+
+
+#: Result of :py:func:`read_many` for a file. ``tags`` is ``None`` if the
+#: file couldn't be read, and ``error`` is the exception raised.
+ReadResult = collections.namedtuple('ReadResult', ['path', 'tags', 'error'])
+
+
+def _read(path, fields, cache=None):
+    try:
+        return ReadResult(path, AudioReader(path, cache=cache).get_tags(
+            fields=fields), None)
+    except Exception as error:
+        return ReadResult(path, None, error)
+
+
+def _map(function, items, workers, ordered, max_pending):
+    """Calls ``function`` with every item using a pool of threads, taking
+    items only when there are less than ``max_pending`` results pending.
+    Pending calls are cancelled if the generator is closed.
+    """
+
+    max_pending = max_pending or 4 * workers
+
+    with ThreadPoolExecutor(workers) as executor:
+        if ordered:
+            pending = collections.deque()
+            try:
+                for item in items:
+                    pending.append(executor.submit(function, item))
+                    if len(pending) >= max_pending:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+        else:
+            pending = set()
+            try:
+                for item in items:
+                    pending.add(executor.submit(function, item))
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending,
+                                             return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending,
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def read_many(paths, workers=4, ordered=True, fields=None,
+              max_pending=None, cache=None):
+    """Reads the tags of many files, using a pool of threads. Errors are
+    returned in the results, not raised.
+
+    Paths are taken from ``paths`` only when there is room for them, at most
+    ``max_pending`` files are being read (or waiting to be consumed) at the
+    same time, so ``paths`` can be a lazy iterable of any length. If the
+    returned generator is closed before the end, the pending files are
+    cancelled.
+
+    ::
+
+        for result in read_many(paths, workers=8):
+            if result.error is None:
+                print(result.path, result.tags)
+
+    :param paths: Iterable of paths.
+    :param workers: Number of threads.
+    :param ordered: If ``True``, the results are in the same order than
+        ``paths``. If ``False``, they are returned as soon as they are ready.
+    :param fields: Tags to read, see :py:meth:`pytag.AudioReader.get_tags`.
+    :param max_pending: Maximum number of files in progress, by default
+        ``4 * workers``.
+    :param cache: A :py:class:`pytag.cache.TagCache`, see
+        :py:class:`pytag.AudioReader`.
+    :returns: A generator of :py:data:`ReadResult`.
+    """
+
+    return _map(functools.partial(_read, fields=fields, cache=cache), paths,
+                workers, ordered, max_pending)
+
+
+def _list_directory(path, extensions, follow_symlinks):
+    """Lists the files with the given extensions and the subdirectories of a
+    directory. Files with several hard links (and directories, when
+    symbolic links are followed) are returned with their ``(st_dev,
+    st_ino)``, to find duplicates, ``None`` for the rest.
+    """
+
+    files = []
+    directories = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        key = None
+                        if follow_symlinks:
+                            stat = entry.stat()
+                            key = (stat.st_dev, stat.st_ino)
+                        directories.append((entry.path, key))
+
+                    elif entry.is_file(follow_symlinks=follow_symlinks) and (
+                            extensions is None or os.path.splitext(
+                                entry.name)[1].lower() in extensions):
+                        stat = entry.stat(follow_symlinks=follow_symlinks)
+                        key = None
+                        if stat.st_nlink > 1:
+                            key = (stat.st_dev, stat.st_ino)
+                        files.append((entry.path, key))
+                except OSError as error:
+                    log.info('Skipped "%s": %s', entry.path, error)
+    except OSError as error:
+        log.info('Skipped directory "%s": %s', path, error)
+
+    return files, directories
+
+
+def iter_files(root, extensions=detection.EXTENSIONS, follow_symlinks=False,
+               walkers=1):
+    """Walks a directory tree, using :py:func:`os.scandir`, and yields the
+    paths of the files with the given extensions. Every file is returned
+    only once, also if it has several hard links. Files and directories
+    which can't be read are skipped.
+
+    :param root: Directory to walk.
+    :param extensions: Lower case extensions of the files to return (with the
+        dot), ``None`` to return all the files.
+    :param follow_symlinks: Follow the symbolic links. Directories found
+        again (for example, in a symbolic link loop) are skipped.
+    :param walkers: If it is more than one, directories are listed in
+        parallel using this number of threads, useful for network file
+        systems. The order of the paths is not defined then.
+    :returns: A generator of paths.
+    """
+
+    seen = set()
+
+    def is_new(key):
+        if key is None:
+            return True
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    if follow_symlinks:
+        try:
+            stat = os.stat(root)
+        except OSError as error:
+            log.info('Skipped directory "%s": %s', root, error)
+            return
+        seen.add((stat.st_dev, stat.st_ino))
+
+    list_directory = functools.partial(_list_directory,
+                                       extensions=extensions,
+                                       follow_symlinks=follow_symlinks)
+
+    if walkers <= 1:
+        stack = [root]
+        while stack:
+            files, directories = list_directory(stack.pop())
+            for path, key in files:
+                if is_new(key):
+                    yield path
+            stack.extend(path for path, key in reversed(directories)
+                         if is_new(key))
+        return
+
+    with ThreadPoolExecutor(walkers) as executor:
+        pending = {executor.submit(list_directory, root)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, directories = future.result()
+                    for path, key in directories:
+                        if is_new(key):
+                            pending.add(executor.submit(list_directory, path))
+                    for path, key in files:
+                        if is_new(key):
+                            yield path
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _scan(path, fields, cache=None):
+    try:
+        with open(path, 'rb') as input_file:
+            mimetype = detection.detect(input_file.read(
+                detection.HEADER_SIZE))
+        if mimetype not in MIMETYPE:
+            return None
+        return ReadResult(path, AudioReader(path, mimetype, cache).get_tags(
+            fields=fields), None)
+    except Exception as error:
+        return ReadResult(path, None, error)
+
+
+def scan(root, extensions=detection.EXTENSIONS, fields=None, workers=4,
+         walkers=1, follow_symlinks=False, max_pending=None, cache=None):
+    """Reads the tags of all the audio files in a directory tree, as they are
+    found. Files are selected by their extension (see :py:func:`iter_files`)
+    and by their signature (see :py:func:`pytag.detection.detect`, libmagic
+    is not used), files with a format not supported are skipped. The files
+    are read with :py:func:`read_many`.
+
+    ::
+
+        for result in pytag.scan('/music', fields=('artist', )):
+            print(result.path, result.tags)
+
+    :param root: Directory to scan.
+    :param extensions: See :py:func:`iter_files`.
+    :param fields: See :py:func:`read_many`.
+    :param workers: See :py:func:`read_many`.
+    :param walkers: See :py:func:`iter_files`.
+    :param follow_symlinks: See :py:func:`iter_files`.
+    :param max_pending: See :py:func:`read_many`.
+    :param cache: See :py:func:`read_many`.
+    :returns: A generator of :py:data:`ReadResult`, not sorted.
+    """
+
+    paths = iter_files(root, extensions, follow_symlinks, walkers)
+    results = _map(functools.partial(_scan, fields=fields, cache=cache),
+                   paths, workers, False, max_pending)
+    try:
+        for result in results:
+            if result is not None:
+                yield result
+    finally:
+        results.close()
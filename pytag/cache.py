@@ -0,0 +1,170 @@
+"""Persistent cache of tags, stored in a SQLite database.
+
+A file is identified by its path and its stat signature (device, inode, size
+and modification time), so cached tags are only used if the file has not
+changed since they were read::
+
+    with TagCache('tags.db') as cache:
+        for path in paths:
+            tags = AudioReader(path, cache=cache).get_tags()
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tags (
+    path TEXT PRIMARY KEY,
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tags TEXT NOT NULL
+)
+'''
+
+
+def stat_signature(stat):
+    """Gets the values which identify a version of a file.
+
+    :param stat: Result of :py:func:`os.stat`.
+    :rtype: ``tuple``
+    """
+
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class TagCache:
+    """Cache of tags stored in a SQLite database, which can be shared by
+    several threads and processes (the database uses WAL mode, so readers
+    don't wait for the writers).
+
+    New tags are saved in groups of ``batch_size``, every group in one
+    transaction. Call :py:meth:`flush` (or :py:meth:`close`, or use it as a
+    context manager) to save the rest.
+
+    Files modified less than ``racy_time`` seconds ago are not cached: they
+    could be modified again without changing their modification time (its
+    resolution is not always good enough), and the cache would not notice
+    it.
+
+    :param path: Path of the database, it is created if it doesn't exist.
+    :param batch_size: Number of tags saved in one transaction.
+    :param racy_time: See above.
+    """
+
+    def __init__(self, path, batch_size=1000, racy_time=2):
+        self.path = path
+        self.batch_size = batch_size
+        self.racy_time = racy_time
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        with connection:
+            connection.execute(_SCHEMA)
+
+    def _connection(self):
+        # SQLite connections can't be used by several threads at once
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def get(self, path, stat=None):
+        """Gets the tags of a file, if the file has not changed.
+
+        :param path: Path of the file.
+        :param stat: Result of :py:func:`os.stat` for the file, if it is
+            already known.
+        :returns: The tags, or ``None`` if they are not in the cache.
+        :rtype: ``dict``
+        """
+
+        signature = stat_signature(stat or os.stat(path))
+
+        with self._lock:
+            pending = self._pending.get(path)
+        if pending is not None:
+            row = pending
+        else:
+            row = self._connection().execute(
+                'SELECT dev, ino, size, mtime_ns, tags FROM tags '
+                'WHERE path = ?', (path, )).fetchone()
+
+        if row is None or tuple(row[:4]) != signature:
+            return None
+        return json.loads(row[4])
+
+    def put(self, path, tags, stat=None):
+        """Saves the tags of a file.
+
+        :param path: Path of the file.
+        :param tags: The tags, values must be JSON serializable.
+        :param stat: Result of :py:func:`os.stat` for the file, taken
+            before reading the tags.
+        """
+
+        stat = stat or os.stat(path)
+        if time.time() - stat.st_mtime < self.racy_time:
+            return
+
+        row = stat_signature(stat) + (json.dumps(dict(tags)), )
+        with self._lock:
+            self._pending[path] = row
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def invalidate(self, path):
+        """Removes the tags of a file."""
+
+        with self._lock:
+            self._pending.pop(path, None)
+        connection = self._connection()
+        with connection:
+            connection.execute('DELETE FROM tags WHERE path = ?', (path, ))
+
+    def flush(self):
+        """Saves the pending tags, in one transaction."""
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO tags '
+                '(path, dev, ino, size, mtime_ns, tags) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                ((path, ) + row for path, row in pending.items()))
+
+    def close(self):
+        """Saves the pending tags and closes the database."""
+
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
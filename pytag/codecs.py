@@ -1,10 +1,11 @@
+import collections
 import struct
 import io
 from array import array
 
 from pytag import utils
-from pytag.structures import CaseInsensitiveDict
-from pytag.constants import VENDOR_NAME
+from pytag.structures import CaseInsensitiveDict, Padding
+from pytag.constants import VENDOR_NAME, MPEG_BITRATES, MPEG_SAMPLE_RATES
 
 
 class VorbisComment:
@@ -15,32 +16,80 @@ class VorbisComment:
     vendor_name = VENDOR_NAME.encode()
     framing_bit = True
 
-    def process_comments(self, packet):
+    #: Free space reserved after the comments when the file is rewritten.
+    padding = Padding(1024)
+
+    #: Size of the padding found by the last ``process_comments`` call.
+    padding_size = 0
+
+    def process_comments(self, packet, fields=None):
         """Reads the comments.
 
-        :param packet: Object to read from, has a read method.
-        :type packet: ``pytag.containers.PacketReader``
-        :returns: A ``dict``-like object with all the comments.
+        :param packet: The comments packet.
+        :type packet: ``bytes``-like object, like the ``memoryview`` returned
+            by ``pytag.containers.PacketReader.read_packet``
+        :param fields: If given, only these comments are decoded (the rest
+            are skipped comparing only their names), and the packet is read
+            until all of them are found.
+        :returns: A ``dict``-like object with all the comments. If a comment
+            is repeated, only the first value is returned.
         :rtype: ``pytag.structures.CaseInsensitiveDict``
         """
 
+        packet = memoryview(packet)
+
         # Signature is not used
-        packet.read(self.signature_struct.size)
+        offset = self.signature_struct.size
 
-        (vendor_lenght,) = utils.int_struct.unpack(packet.read(4))
-        packet.read(vendor_lenght)
+        (vendor_lenght,) = utils.int_struct.unpack_from(packet, offset)
+        offset += 4 + vendor_lenght
 
-        (user_comment_list_length,) = utils.int_struct.unpack(packet.read(4))
+        (user_comment_list_length,) = utils.int_struct.unpack_from(packet,
+                                                                   offset)
+        offset += 4
+
+        if fields is not None:
+            # Names of the wanted comments, with the separator
+            wanted = {'{}='.format(field).lower().encode()
+                      for field in fields}
+            name_size = max(map(len, wanted), default=0)
 
         comments = CaseInsensitiveDict()
         for i in range(user_comment_list_length):
-            (length,) = utils.int_struct.unpack(packet.read(4))
-            comment = packet.read(length).decode('utf-8')
-            comments.update((comment.split('='),))
+            if fields is not None and not wanted:
+                return comments
+
+            (length,) = utils.int_struct.unpack_from(packet, offset)
+            offset += 4
+
+            if fields is not None:
+                name = bytes(packet[offset:offset + min(length, name_size)])
+                name = name[:name.find(b'=') + 1].lower()
+                if name not in wanted:
+                    offset += length
+                    continue
+                wanted.discard(name)
+
+            comment = str(packet[offset:offset + length], 'utf-8')
+            offset += length
+            name, value = comment.split('=', 1)
+            comments.setdefault(name, value)
+
+        # Padding: zeros after the comments (and the framing bit)
+        if fields is None:
+            rest = packet[offset + self.framing_bit:].tobytes()
+            self.padding_size = 0 if rest.strip(b'\x00') else len(rest)
 
         return comments
 
     def generate_comments(self, comments):
+        """Creates a comments packet.
+
+        :param comments: Comments to save.
+        :returns: The new packet.
+        :rtype: ``io.BytesIO``
+        """
+
         comments = CaseInsensitiveDict(comments)
 
         # Packet type + vorbis magic
@@ -64,6 +113,7 @@ class VorbisComment:
 
 class Vorbis(VorbisComment):
 
+    id_signature = b'\x01vorbis'
     signature = (0x3, 0x76, 0x6f, 0x72, 0x62, 0x69, 0x73)
     signature_struct = struct.Struct('< B 6s')
 
@@ -73,9 +123,14 @@ class Vorbis(VorbisComment):
     def packets_after_comments(self):
         return 1
 
+    def granule_to_seconds(self, id_packet, granule_position):
+        (sample_rate,) = utils.int_struct.unpack_from(id_packet, 12)
+        return granule_position / sample_rate
+
 
 class Opus(VorbisComment):      # pragma: no cover
 
+    id_signature = b'OpusHead'
     signature = (0x4f, 0x70, 0x75, 0x73, 0x54, 0x61, 0x67, 0x73)
     signature_struct = struct.Struct('< 8s')
     framing_bit = False
@@ -85,3 +140,124 @@ class Opus(VorbisComment):      # pragma: no cover
 
     def packets_after_comments(self):
         return 0
+
+    def granule_to_seconds(self, id_packet, granule_position):
+        # Always 48 kHz, minus the samples to skip at the beginning
+        (pre_skip,) = struct.unpack_from('< H', id_packet, 10)
+        return max(granule_position - pre_skip, 0) / 48000
+
+
+#: MPEG audio stream properties. The duration is in seconds and the bitrate
+#: in bit/s (the average one for VBR streams). ``vbr_header`` is the header
+#: used to get the number of frames (``'Xing'``, ``'Info'``, ``'VBRI'``), or
+#: ``None`` if the values are estimated. The encoder delay and padding (in
+#: samples, from the LAME header) are ``0`` if they are not known.
+MpegInfo = collections.namedtuple('MpegInfo', [
+    'version', 'layer', 'sample_rate', 'channels', 'bitrate', 'duration',
+    'frames', 'vbr_header', 'encoder_delay', 'encoder_padding'])
+
+# Xing/Info header: identifier and flags
+xing_struct = struct.Struct('> 4s I')
+
+# VBRI header: identifier, version, delay, quality, bytes and frames
+vbri_struct = struct.Struct('> 4s H H H I I')
+
+
+class MpegFrame:
+    """Header of a MPEG audio frame (layer I, II or III), stored in a buffer.
+    See: http://www.mp3-tech.org/programmer/frame_header.html
+
+    :param buffer: Buffer with the frame.
+    :param offset: Where the frame starts in the buffer.
+    :raises ValueError: If there is no valid frame header at ``offset``.
+    """
+
+    __slots__ = ('buffer', 'offset', 'version', 'layer', 'bitrate',
+                 'sample_rate', 'channels', 'samples', 'size')
+
+    def __init__(self, buffer, offset=0):
+
+        if len(buffer) - offset < 4:
+            raise ValueError('No MPEG frame at {}'.format(offset))
+
+        header = int.from_bytes(buffer[offset:offset + 4], byteorder='big')
+        version = (2.5, None, 2, 1)[header >> 19 & 3]
+        layer = (None, 3, 2, 1)[header >> 17 & 3]
+        bitrate_index = header >> 12 & 15
+        sample_rate_index = header >> 10 & 3
+
+        if (header >> 21 != 0x7FF or version is None or layer is None or
+                bitrate_index in (0, 15) or sample_rate_index == 3):
+            raise ValueError('No MPEG frame at {}'.format(offset))
+
+        self.buffer = buffer
+        self.offset = offset
+        self.version = version
+        self.layer = layer
+        self.bitrate = MPEG_BITRATES[min(version, 2), layer][
+            bitrate_index] * 1000
+        self.sample_rate = MPEG_SAMPLE_RATES[version][sample_rate_index]
+        self.channels = 1 if header >> 6 & 3 == 3 else 2
+
+        padding = header >> 9 & 1
+        if layer == 1:
+            self.samples = 384
+            self.size = (12 * self.bitrate // self.sample_rate + padding) * 4
+        else:
+            self.samples = 576 if layer == 3 and version != 1 else 1152
+            self.size = (self.samples // 8 * self.bitrate //
+                         self.sample_rate + padding)
+
+    def vbr_header(self):
+        """Reads the Xing/Info (with the LAME extension) or VBRI header
+        stored in the frame, if there is one.
+
+        :returns: ``(identifier, number of frames, number of bytes, encoder
+            delay, encoder padding)``. The number of frames and bytes are
+            ``None`` if the header doesn't have them.
+        :rtype: ``tuple`` or ``None``
+        """
+
+        buffer = self.buffer
+
+        # Xing/Info header is after the side information
+        if self.version == 1:
+            side_info = 17 if self.channels == 1 else 32
+        else:
+            side_info = 9 if self.channels == 1 else 17
+        offset = self.offset + 4 + side_info
+
+        if len(buffer) >= offset + xing_struct.size and bytes(
+                buffer[offset:offset + 4]) in (b'Xing', b'Info'):
+            identifier, flags = xing_struct.unpack_from(buffer, offset)
+            offset += xing_struct.size
+            frames = size = None
+            if flags & 1:
+                (frames,) = struct.unpack_from('> I', buffer, offset)
+                offset += 4
+            if flags & 2:
+                (size,) = struct.unpack_from('> I', buffer, offset)
+                offset += 4
+            if flags & 4:  # Table of contents
+                offset += 100
+            if flags & 8:  # Quality
+                offset += 4
+
+            delay = padding = 0
+            if (len(buffer) >= offset + 24 and
+                    bytes(buffer[offset:offset + 4]) == b'LAME'):
+                gapless = int.from_bytes(buffer[offset + 21:offset + 24],
+                                         byteorder='big')
+                delay, padding = gapless >> 12, gapless & 0xFFF
+
+            return identifier.decode(), frames, size, delay, padding
+
+        # VBRI header, always 32 bytes after the frame header
+        offset = self.offset + 4 + 32
+        if len(buffer) >= offset + vbri_struct.size and bytes(
+                buffer[offset:offset + 4]) == b'VBRI':
+            (identifier, version, delay, quality, size,
+             frames) = vbri_struct.unpack_from(buffer, offset)
+            return 'VBRI', frames, size, 0, 0
+
+        return None
@@ -1,5 +1,11 @@
 VENDOR_NAME = 'pytag 0.1 20130601'
 
+#: Durability policies used when a file is written. With ``SYNC_NONE`` the
+#: operating system decides when the data goes to the disk, ``SYNC_FILE``
+#: waits until the file data is in the disk (fsync), and ``SYNC_DIRECTORY``
+#: also waits for its directory entry, so a renamed file survives a crash.
+SYNC_NONE, SYNC_FILE, SYNC_DIRECTORY = range(3)
+
 ID3_ENCODINGS = ('ascii', 'utf_16', 'utf_16_be', 'utf_8')
 
 #: Default comments/tags accepted by pytag
@@ -10,6 +16,32 @@ TAG_ID3_V22 = ('TT2', 'TP1', 'TAL', 'TYE', 'TRK', 'TPB', 'TCO', 'TOA')
 TAG_ID3_V23 = ('TIT2', 'TPE1', 'TALB', 'TYER', 'TRCK', 'TPUB', 'TCON', 'TOPE')
 TAG_ID3_V24 = ('TIT2', 'TPE1', 'TALB', 'TDRC', 'TRCK', 'TPUB', 'TCON', 'TOPE')
 
+#: Supported APEv2 items, by lower case key
+TAG_APE = {'title': 'title', 'artist': 'artist', 'album': 'album',
+           'year': 'date', 'track': 'tracknumber',
+           'publisher': 'organization', 'genre': 'genre',
+           'performer': 'performer'}
+
+#: MPEG audio bitrates in kbit/s, by (version, layer) and bitrate index.
+#: MPEG 2.5 uses the MPEG 2 bitrates.
+MPEG_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416,
+             448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320,
+             384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256,
+             320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224,
+             256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+#: MPEG audio sample rates, by version and sample rate index.
+MPEG_SAMPLE_RATES = {1: (44100, 48000, 32000),
+                     2: (22050, 24000, 16000),
+                     2.5: (11025, 12000, 8000)}
+
 ID3_GENRES = {
     0: 'Blues',
     1: 'Classic Rock',
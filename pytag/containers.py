@@ -1,16 +1,34 @@
 import struct
 import io
+import mmap
 import collections
-import tempfile
-import shutil
+import contextlib
+import itertools
 import abc
 
 from array import array
 
 from pytag import utils
+from pytag.crc import OggCRC
+from pytag.constants import SYNC_NONE
 
 
 PacketInfo = collections.namedtuple('PacketInfo', ['size', 'complete'])
+HeaderPages = collections.namedtuple('HeaderPages', ['offset', 'size',
+                                                     'number', 'count',
+                                                     'packets',
+                                                     'interleaved'])
+
+
+def lacing_values(size):
+    """Gets the segment table values (lacing values) used to store a packet.
+
+    :param size: Packet size.
+    :returns: List of lacing values, the last one is always smaller than 255.
+    :rtype: ``list``
+    """
+
+    return [255] * (size // 255) + [size % 255]
 
 
 class OggPage:
@@ -28,6 +46,7 @@ class OggPage:
 
         self.fileobj = fileobj
         self.segment_table_index = 0
+        self.offset = fileobj.tell()
 
         self._unpack(fileobj.read(27))
         self.segment_table = array('B', fileobj.read(self.page_segments))
@@ -69,8 +88,7 @@ class OggPage:
         self.segment_table_index = len(self.segment_table)
 
         if update_crc:
-            crc = utils.crc32(page)
-            page[22:26] = array('B', crc)
+            page[22:26] = array('B', OggCRC(page).digest())
 
         return page
 
@@ -123,7 +141,7 @@ class OggPage:
         for size in self.segment_table[self.segment_table_index:]:
             self.segment_table_index += 1
             total_size += size
-            if size is not 255:
+            if size != 255:
                 return PacketInfo(size=total_size, complete=True)
 
         return PacketInfo(size=total_size, complete=False)
@@ -152,50 +170,257 @@ class OggPage:
                 .format(o=self))
 
 
+class OggPageView:
+    """Read only view of an Ogg page stored in a buffer, usually a
+    :py:class:`mmap.mmap` of the whole file. Only the header is parsed, the
+    segment table and the payload are exposed as ``memoryview`` objects.
+
+    :param buffer: Buffer with the page.
+    :param offset: Where the page starts in the buffer.
+    :raises ValueError: If there is no Ogg page at ``offset``.
+    """
+
+    __slots__ = ('buffer', 'offset', 'size', 'header_type',
+                 'granule_position', 'serial', 'number', 'crc',
+                 'page_segments')
+
+    def __init__(self, buffer, offset=0):
+
+        if len(buffer) - offset < 27:
+            raise ValueError('No Ogg page at {}'.format(offset))
+
+        (oggs, version, self.header_type, self.granule_position,
+         self.serial, self.number, self.crc, self.page_segments) = (
+            OggPage.header_struct.unpack_from(buffer, offset))
+
+        if oggs != b'OggS':
+            raise ValueError('No Ogg page at {}'.format(offset))
+
+        self.buffer = buffer
+        self.offset = offset
+        table_end = offset + 27 + self.page_segments
+        self.size = 27 + self.page_segments + sum(buffer[offset + 27:
+                                                         table_end])
+
+        if offset + self.size > len(buffer):
+            raise ValueError('Truncated Ogg page at {}'.format(offset))
+
+    @property
+    def data(self):
+        """The complete page."""
+
+        return memoryview(self.buffer)[self.offset:self.offset + self.size]
+
+    @property
+    def segment_table(self):
+        start = self.offset + 27
+        return memoryview(self.buffer)[start:start + self.page_segments]
+
+    @property
+    def payload(self):
+        """The page segments."""
+
+        start = self.offset + 27 + self.page_segments
+        return memoryview(self.buffer)[start:self.offset + self.size]
+
+    def is_last_page(self):
+        """Check if the page is the last in a logical bitstream."""
+
+        return bool(self.header_type & 4)
+
+    def check_crc(self):
+        """Check if the CRC stored in the page is valid.
+
+        :rtype: ``boolean``
+        """
+
+        data = self.data
+        crc = OggCRC(data[:22]).update(bytes(4)).update(data[26:])
+        return crc.value == self.crc
+
+    def renumbered(self, number):
+        """Get a copy of the page, with other sequence number.
+
+        :returns: Ogg page with the new number and CRC.
+        :rtype: ``bytearray``
+        """
+
+        page = bytearray(self.data)
+        page[18:22] = utils.int_struct.pack(number)
+        page[22:26] = bytes(4)
+        page[22:26] = OggCRC(page).digest()
+        return page
+
+
+def iter_pages(buffer, offset=0):
+    """Iterates over the Ogg pages stored in a buffer, the pages are located
+    using only the headers and segment tables. Stops at the end of the buffer
+    or when there is no Ogg page where one is expected.
+
+    :param buffer: Buffer with Ogg pages, usually a :py:class:`mmap.mmap` of
+        the whole file.
+    :param offset: Where the first page is.
+    :returns: Iterator over ``OggPageView`` objects.
+    """
+
+    while True:
+        try:
+            page = OggPageView(buffer, offset)
+        except ValueError:
+            return
+        yield page
+        offset += page.size
+
+
+def iter_packets(pages):
+    """Iterates over the packets stored in the pages of a logical bitstream.
+
+    :param pages: ``OggPageView`` objects, all with the same serial number.
+    :returns: Iterator over the packets. Packets stored in only one page are
+        not copied.
+    :rtype: ``memoryview``
+    """
+
+    partial = None  # Start of a packet which continues in the next page
+    for page in pages:
+        payload = page.payload
+        start = position = 0
+        for size in page.segment_table:
+            position += size
+            if size != 255:
+                if partial is None:
+                    yield payload[start:position]
+                else:
+                    partial += payload[start:position]
+                    yield memoryview(partial)
+                    partial = None
+                start = position
+
+        if start != position:
+            if partial is None:
+                partial = bytearray()
+            partial += payload[start:position]
+
+
+def map_file(fileobj):
+    """Maps a file in memory, read only.
+
+    :rtype: :py:class:`mmap.mmap`
+    """
+
+    return mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 class PacketReader:
-    """My class doc."""
+    """File-like object to read the packets of an Ogg stream. Where every
+    part of a packet is, is given by a callback, see
+    :py:meth:`OggPage.get_packet_info`.
+    """
 
     def __init__(self, fileobj, get_packet_info_callback):
-        """Method doc"""
+        """Inizializates a PacketReader
+
+        :param fileobj: Stream to read from.
+        :param get_packet_info_callback: Returns the size of the next part of
+            the packet, and if the packet finish with that part.
+        """
 
         self.fileobj = fileobj
         self.get_packet_info_callback = get_packet_info_callback
         self.position = 0
 
-    def read(self, _n=-1):
+    def read(self, n=-1):
         """Read up to n bytes from the current packet in the stream and return
         them. If n is unspecified or -1, read and return all the bytes until
         the packet end.
         """
 
-        if self.position == 0:
-            self.limit, self.complete = self.get_packet_info_callback()
-
-        # Read complete packet
-        if _n == -1:
-            partial_n = self.limit - self.position
-            ret = self.fileobj.read(partial_n)
-            while not self.complete:
-                self.position = 0
-                self.limit, self.complete = self.get_packet_info_callback()
-                ret += self.fileobj.read(self.limit)
-
-        # Read n bytes from packet
+        if n < 0:
+            return self.read_packet().tobytes()
+
+        buf = bytearray(n)
+        return bytes(memoryview(buf)[:self.readinto(buf)])
+
+    def readinto(self, b):
+        """Read bytes from the stream into a pre-allocated, writable
+        ``bytes``-like object, like :py:meth:`io.RawIOBase.readinto`.
+
+        :returns: Number of bytes read.
+        :rtype: ``int``
+        """
+
+        view = memoryview(b).cast('B')
+        return self._consume(len(view), lambda start, size: (
+            self.fileobj.readinto(view[start:start + size]) or 0))
+
+    def read_packet(self):
+        """Read all the bytes until the packet end. The packet is assembled in
+        a single ``bytearray``.
+
+        :returns: A view over the packet.
+        :rtype: ``memoryview``
+        """
+
+        packet = bytearray()
+        self._consume_packet(lambda size: packet.extend(
+            self.fileobj.read(size)))
+        return memoryview(packet)
+
+    def skip(self, n=-1):
+        """Skip n bytes, without reading them. If n is unspecified or -1,
+        skip all the bytes until the packet end.
+        """
+
+        if n < 0:
+            self._consume_packet(self._seek)
         else:
-            ret = b''
-            while _n != 0:
-                if _n + self.position <= self.limit:
-                    partial_n = _n
-                else:
-                    partial_n = self.limit - self.position
-                _n -= partial_n
-                self.position += partial_n
-                ret += self.fileobj.read(partial_n)
-                if _n != 0:
-                    self.position = 0
-                    self.limit, self.complete = self.get_packet_info_callback()
+            self._consume(n, lambda start, size: self._seek(size))
+
+    def _seek(self, size):
+        self.fileobj.seek(size, io.SEEK_CUR)
+        return size
+
+    def _next_part(self):
+        self.position = 0
+        self.limit, self.complete = self.get_packet_info_callback()
 
-        return ret
+    def _consume(self, n, consume):
+        """Moves n bytes forward, calling ``consume(start, size)`` for every
+        part of the packets, which returns the number of bytes consumed.
+        """
+
+        if self.position == 0:
+            self._next_part()
+
+        done = 0
+        while True:
+            size = min(n - done, self.limit - self.position)
+            if size:
+                consumed = consume(done, size)
+                self.position += consumed
+                done += consumed
+                if consumed < size:  # End of file
+                    break
+            if done == n:
+                break
+            self._next_part()
+
+        return done
+
+    def _consume_packet(self, consume):
+        """Moves to the packet end, calling ``consume(size)`` for every part of
+        the packet.
+        """
+
+        if self.position == 0:
+            self._next_part()
+
+        consume(self.limit - self.position)
+        while not self.complete:
+            self._next_part()
+            consume(self.limit)
+
+        self.position = 0
 
 
 class OggReader(metaclass=abc.ABCMeta):
@@ -203,31 +428,136 @@ class OggReader(metaclass=abc.ABCMeta):
     def __init__(self, path):
         self.path = path
 
-    def get_tags(self):
-        with open(self.path, 'rb') as input_file:
-            current_page = OggPage(input_file)
-            for i in range(self.comments_page_position()):
-                current_page.next_page()
-            tags = self.process_comments(current_page.get_packet_reader())
+    def get_tags(self, fields=None):
+        """Reads the comments of the first logical bitstream with this codec,
+        pages from other streams are skipped.
+
+        :param fields: If given, only these comments are read, see
+            :py:meth:`pytag.codecs.VorbisComment.process_comments`.
+        :raises ValueError: If the file has no stream with this codec.
+        """
 
+        with open(self.path, 'rb') as input_file:
+            with map_file(input_file) as buffer:
+                with contextlib.closing(
+                        self._iter_comments(buffer, fields)) as links:
+                    tags = next(links, None)
+
+        if tags is None:
+            raise ValueError('No {} stream found'.format(
+                self.__class__.__name__))
         return tags
 
+    def get_chained_tags(self):
+        """Reads the comments of every link of a chained stream (several
+        streams with this codec one after another) in one pass.
+
+        :returns: The comments of every link.
+        :rtype: ``list``
+        """
+
+        with open(self.path, 'rb') as input_file:
+            with map_file(input_file) as buffer:
+                return list(self._iter_comments(buffer))
+
+    def _iter_comments(self, buffer, fields=None):
+        """Iterates over the comments of every logical bitstream with this
+        codec, stored in its second packet. Pages of other streams are skipped
+        using only their length.
+        """
+
+        serial = None
+        for page in iter_pages(buffer):
+
+            # Beginning of stream, check the identification header
+            if serial is None and page.header_type & 2:
+                size = len(self.id_signature)
+                if page.payload[:size] == self.id_signature:
+                    serial = page.serial
+                    comments = self._read_stream_comments(page, buffer,
+                                                          fields)
+                    if comments is not None:
+                        yield comments
+
+            elif page.serial == serial and page.is_last_page():
+                serial = None
+
+    def _read_stream_comments(self, first, buffer, fields=None):
+        """Reads the comments of the logical bitstream which starts with the
+        page ``first``.
+        """
+
+        pages = (page for page in iter_pages(buffer, first.offset)
+                 if page.serial == first.serial)
+
+        with contextlib.closing(iter_packets(pages)) as packets:
+            for i, packet in enumerate(packets):
+                if i == 1:  # After the identification header
+                    return self.process_comments(packet, fields)
+
+    def verify(self):
+        """Check the CRC of all the pages, and that the pages fill the whole
+        file (a broken or truncated page stops :py:func:`iter_pages`).
+
+        :returns: True if all the pages are valid, False for an empty file.
+        :rtype: ``boolean``
+        """
+
+        with open(self.path, 'rb') as input_file:
+            if not input_file.seek(0, io.SEEK_END):
+                return False
+            with map_file(input_file) as buffer:
+                end = 0
+                for page in iter_pages(buffer):
+                    if not page.check_crc():
+                        return False
+                    end = page.offset + page.size
+                return end == len(buffer)
+
+    def get_duration(self):
+        """Get the duration, from the granule position of the last page of
+        the first logical bitstream.
+
+        :returns: Duration in seconds.
+        :rtype: ``float``
+        """
+
+        with open(self.path, 'rb') as input_file:
+            with map_file(input_file) as buffer:
+                pages = iter_pages(buffer)
+                first = next(pages)
+                id_packet = first.payload.tobytes()
+
+                granule_position = 0
+                for page in pages:
+                    if page.serial == first.serial:
+                        if page.granule_position != -1:
+                            granule_position = page.granule_position
+                        if page.is_last_page():
+                            break
+
+        return self.granule_to_seconds(id_packet, granule_position)
+
     @abc.abstractmethod
     def comments_page_position(self):
         """Returns the page number where the comments start."""
 
     @abc.abstractmethod
-    def process_comments(self, packet):
+    def granule_to_seconds(self, id_packet, granule_position):
+        """Converts a granule position to seconds."""
+
+    @abc.abstractmethod
+    def process_comments(self, packet, fields=None):
         """Returns the comments."""
 
 
 class Ogg(OggReader):
 
-    def __init__(self, path):
+    #: Buffer size used to copy the audio pages when the file is rewritten.
+    buffer_size = utils.BUFFER_SIZE
 
-        self.output_page_nr = 0
-        self.page_out = array('B')
-        super().__init__(path)
+    #: Durability policy, see :py:data:`pytag.constants.SYNC_NONE`.
+    sync = SYNC_NONE
 
     @abc.abstractmethod
     def packets_after_comments(self):
@@ -236,85 +566,232 @@ class Ogg(OggReader):
         """
 
     def write_tags(self, comments):
-        """Write the tags to a new file, if no path is provided, the original
-        file is overwrited
+        """Write the tags to the file.
+
+        If the new comments fit in the pages used by the old header packets,
+        only those pages are overwritten (the comments packet is padded to
+        fill them). If not, the whole file is rewritten: when the new header
+        packets can be laid out in the same number of pages, the audio pages
+        are copied as they are, if not, all the following pages are
+        renumbered. In both cases, some padding is added to the comments, see
+        :py:attr:`pytag.codecs.VorbisComment.padding`.
         """
 
-        with tempfile.NamedTemporaryFile('wb',
-                                         delete=False) as self.output_file,\
-                open(self.path, 'rb') as input_file:
+        packet = self.generate_comments(comments).getvalue()
 
-            # First page, get serial number and write
-            current_page = OggPage(input_file)
-            self.serial = current_page.serial
-            self.output_file.write(current_page.as_bytes())
+        with open(self.path, 'rb') as input_file:
+            header = self._read_header_pages(input_file)
+
+        # The pages of other streams between the header pages can't be
+        # overwritten
+        pages = None
+        if not header.interleaved:
+            pages = self._fill_header_pages(packet, header)
+        if pages:
+            with open(self.path, 'r+b') as output_file:
+                output_file.seek(header.offset)
+                output_file.writelines(pages)
+                if self.sync:
+                    utils.fsync(output_file)
+            return
+
+        # Reserve some space, so next time the comments can be written in
+        # place
+        padded = packet + bytes(self.padding(len(packet)))
+
+        pages = (self._keep_header_pages(padded, header) or
+                 self._keep_header_pages(packet, header) or
+                 self._paginate([padded] + header.packets, header.number))
+        new_pages = len(pages) - header.count
+
+        with utils.replace_file(self.path, self.sync) as output_file,\
+                open(self.path, 'rb') as input_file:
 
-            # Second page
-            current_page.next_page()
+            output_file.write(input_file.read(header.offset))
+            output_file.writelines(pages)
+            end = offset = header.offset + header.size
+
+            # We need to increment the page secuence number for all pages,
+            # and to keep the pages of other streams between the old header
+            # pages
+            if new_pages or header.interleaved:
+                if header.interleaved:
+                    offset = header.offset
+                with map_file(input_file) as buffer:
+                    for page in iter_pages(buffer, offset):
+                        if page.offset >= end and not new_pages:
+                            break
+                        if page.serial != self.serial:
+                            output_file.write(page.data)
+                        elif page.offset >= end:
+                            output_file.write(
+                                page.renumbered(page.number + new_pages))
+                        offset = page.offset + page.size
+
+            input_file.seek(offset)
+            utils.copy_stream(input_file, output_file,
+                              buffer_size=self.buffer_size)
+
+    def _read_header_pages(self, input_file):
+        """Finds the pages which contain the comments packet and the header
+        packets after it, in the first logical bitstream with this codec (as
+        :py:meth:`get_tags`). Pages of other streams are skipped.
+
+        :returns: Where the pages are, and the header packets after the
+            comments.
+        :rtype: :py:class:`collections.namedtuple` of type ``HeaderPages``
+        :raises ValueError: If the file has no stream with this codec, if the
+            comments packet doesn't start its Ogg page, or if the last header
+            packet doesn't finish its page, as required by the codec
+            specifications.
+        """
 
-            # Get a packet reader
-            packet_reader = current_page.get_packet_reader()
+        size = len(self.id_signature)
+        with map_file(input_file) as buffer:
+            for first in iter_pages(buffer):
+                if (first.header_type & 2 and
+                        first.payload[:size] == self.id_signature):
+                    break
+            else:
+                raise ValueError('No {} stream found'.format(
+                    self.__class__.__name__))
+
+            self.serial = first.serial
+            stream = (page for page in iter_pages(buffer, first.offset)
+                      if page.serial == first.serial)
+
+            pages = []
+            remaining = 1 + self.packets_after_comments()
+            for i, page in enumerate(stream):
+                if i < self.comments_page_position():
+                    continue
+                pages.append(page)
+                table = bytes(page.segment_table)
+                for j, lacing in enumerate(table):
+                    if lacing < 255:
+                        remaining -= 1
+                        if not remaining:
+                            break
+                if not remaining:
+                    if j != len(table) - 1:
+                        raise ValueError(
+                            'Last header packet must finish its Ogg page')
+                    break
+            else:
+                raise ValueError('Truncated {} header'.format(
+                    self.__class__.__name__))
+
+            signature = bytes(self.signature)
+            if (pages[0].header_type & 1 or
+                    pages[0].payload[:len(signature)] != signature):
+                raise ValueError('Comments packet must start its Ogg page')
+
+            packets = [bytes(packet) for packet in
+                       itertools.islice(iter_packets(pages), 1, None)]
+
+        offset, last = pages[0].offset, pages[-1]
+        size = last.offset + last.size - offset
+        return HeaderPages(offset=offset, size=size, number=pages[0].number,
+                           count=len(pages), packets=packets,
+                           interleaved=sum(p.size for p in pages) != size)
+
+    def _fill_header_pages(self, packet, header):
+        """Pads the comments packet to use exactly the same pages, and bytes,
+        that the old header pages.
+
+        :param packet: New comments packet.
+        :param header: Old header pages.
+        :type header: :py:class:`collections.namedtuple` of type
+            ``HeaderPages``
+        :returns: The new header pages, or ``None`` if is not possible.
+        :rtype: ``list`` of ``bytearray``
+        """
 
-            # Ignore old comments, advance to next packet
-            packet_reader.read()
+        # Bytes available for the padded comments packet and its lacing values
+        available = header.size - 27 * header.count - sum(
+            len(p) + len(lacing_values(len(p))) for p in header.packets)
 
-            # Generate and write new comments
-            codec_packet = self.generate_comments(comments)
-            self._to_page(codec_packet)
+        # A packet of size n needs n + n // 255 + 1 bytes
+        estimation = (available - 1) * 255 // 256
+        for size in range(estimation - 1, estimation + 2):
+            if size >= len(packet) and size + size // 255 + 1 == available:
+                break
+        else:
+            return None
+
+        packet = packet + bytes(size - len(packet))
+        pages = self._paginate([packet] + header.packets, header.number,
+                               header.count)
+
+        if pages is None or sum(map(len, pages)) != header.size:
+            return None     # pragma: no cover
+        return pages
+
+    def _keep_header_pages(self, packet, header):
+        """Lays out the new comments packet and the header packets after it
+        in the same number of pages used by the old header packets. If there
+        are not enough lacing values to fill all the pages, the comments
+        packet is padded.
+
+        :param packet: New comments packet.
+        :param header: Old header pages.
+        :type header: :py:class:`collections.namedtuple` of type
+            ``HeaderPages``
+        :returns: The new header pages, or ``None`` if is not possible.
+        :rtype: ``list`` of ``bytearray``
+        """
 
-            # Read setup header
-            for i in range(self.packets_after_comments()):
-                codec_packet = packet_reader.read()
-                self._to_page(io.BytesIO(codec_packet), force_page_end=True)
+        segments = sum(len(lacing_values(len(p)))
+                       for p in [packet] + header.packets)
+        if segments < header.count:
+            packet = packet + bytes(255 * (header.count - segments))
+
+        return self._paginate([packet] + header.packets, header.number,
+                              header.count)
+
+    def _paginate(self, packets, number, page_count=None):
+        """Lays out packets in Ogg pages. The first packet starts a new page
+        and the last packet finishes the last page.
+
+        :param packets: ``bytes``-like objects to pack.
+        :param number: Sequence number of the first page.
+        :param page_count: Exact number of pages to use. If ``None``, uses as
+            few pages as possible.
+        :returns: The pages, or ``None`` if the packets don't fit in
+            ``page_count`` pages.
+        :rtype: ``list`` of ``bytearray``
+        """
 
-            new_pages = self.output_page_nr - current_page.number
-            # We need to increment the page secuence number for all pages
-            if new_pages > 0:
-                for page in current_page.rest_of_pages():
-                    page.number += new_pages
-                    self.output_file.write(page.as_bytes(update_crc=True))
-            else:
-                self.output_file.write(input_file.read())
-
-        shutil.move(self.output_file.name, self.path)
-
-    def _to_page(self, packet, p_type=0, force_page_end=False):
-
-        if len(self.page_out) is 0:
-            self.page_out.extend(b'OggS')
-            self.page_out.extend([0,                       # Version
-                                  p_type,                  # Header type
-                                  0, 0, 0, 0, 0, 0, 0, 0,  # Granular position
-                                  ])
-
-            self.page_out.extend(utils.int_struct.pack(self.serial))  # Ser.Nr
-            self.output_page_nr += 1
-            self.page_out.extend(utils.int_struct.pack(self.output_page_nr))
-
-            self.page_out.extend([0, 0, 0, 0,  # CRC
-                                  0])        # Nr page segments
-
-            self.s_table = array('B')
-            self.segments = array('B')
-
-        for segment in utils.read_in_chunks(packet, 255):
-            self.s_table.append(len(segment))
-            self.segments.extend(segment)
-            if len(self.s_table) == 255:
-                # Page is full, write and continue in new page
-                self._write_page()
-                self.page_out = array('B')
-                self._to_page(packet, p_type=1)
-
-        # Finish this page
-        if force_page_end:
-            self._write_page()
-            self.page_out = array('B')
-
-    def _write_page(self):
-        self.page_out[-1] = len(self.s_table)
-        crc = utils.crc32(self.page_out, self.s_table, self.segments)
-        self.page_out[22:26] = array('B', crc)
-        self.output_file.write(self.page_out)
-        self.output_file.write(self.s_table)
-        self.output_file.write(self.segments)
+        lacing = []
+        for packet in packets:
+            lacing.extend(lacing_values(len(packet)))
+
+        if page_count is None:
+            page_count = -(-len(lacing) // 255)
+        elif not page_count <= len(lacing) <= 255 * page_count:
+            return None
+
+        data = b''.join(packets)
+        pages = []
+        start = position = 0
+        for i in range(page_count):
+            # Fill the page, but keep one segment for every remaining page
+            end = min(start + 255, len(lacing) - (page_count - i - 1))
+            segment_table = lacing[start:end]
+            size = sum(segment_table)
+
+            header_type = 1 if start and lacing[start - 1] == 255 else 0
+            # Granule position is -1 if no packet finishes in the page
+            granule_position = 0 if min(segment_table) < 255 else -1
+
+            page = bytearray(OggPage.header_struct.pack(
+                b'OggS', 0, header_type, granule_position, self.serial,
+                number + i, 0, len(segment_table)))
+            page.extend(segment_table)
+            page.extend(data[position:position + size])
+            page[22:26] = OggCRC(page).digest()
+
+            pages.append(page)
+            start, position = end, position + size
+
+        return pages
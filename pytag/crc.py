@@ -0,0 +1,81 @@
+"""CRC-32 checksum used by the Ogg container.
+
+Ogg uses the polynomial ``0x04C11DB7`` without input/output reflection, a zero
+initial value and no final xor, see: http://www.xiph.org/ogg/doc/framing.html
+
+That is the bit-reversed twin of the CRC implemented by :py:mod:`zlib` (which
+is reflected), so the checksum is computed in C by reversing the bits of every
+input byte with :py:meth:`bytes.translate` and feeding the result to
+:py:func:`zlib.crc32`, instead of looping over every byte in Python.
+"""
+
+import zlib
+
+
+_REVERSED_BYTES = bytes(int('{:08b}'.format(i)[::-1], 2) for i in range(256))
+
+
+def _reflect32(value):
+    return int('{:032b}'.format(value)[::-1], 2)
+
+
+class OggCRC:
+    """Incremental Ogg CRC-32.
+
+    ::
+
+        crc = OggCRC()
+        crc.update(header)
+        crc.update(segment_table).update(segments)
+        page[22:26] = crc.digest()
+
+    :param data: Optional first chunk of data, same as calling
+        :py:meth:`update`.
+    """
+
+    __slots__ = ('_register', )
+
+    def __init__(self, data=b''):
+        # The register is kept reflected, as zlib uses it
+        self._register = 0
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        """Adds more data to the checksum.
+
+        :param data: Any bytes-like object (``bytes``, ``bytearray``,
+            ``memoryview``, ``array('B')``...).
+        :returns: The same object, to allow chained calls.
+        :rtype: ``OggCRC``
+        """
+
+        if not isinstance(data, (bytes, bytearray)):
+            data = bytes(data)
+        data = data.translate(_REVERSED_BYTES)
+        self._register = zlib.crc32(data, self._register ^ 0xFFFFFFFF)
+        self._register ^= 0xFFFFFFFF
+        return self
+
+    @property
+    def value(self):
+        """Checksum as an integer."""
+
+        return _reflect32(self._register)
+
+    def digest(self):
+        """Checksum as it is stored in the Ogg page header (little endian).
+
+        :rtype: ``bytes``
+        """
+
+        return self.value.to_bytes(4, 'little')
+
+    def copy(self):
+        """Returns a copy of this object, useful to checksum several buffers
+        which share the same prefix.
+        """
+
+        other = OggCRC()
+        other._register = self._register
+        return other
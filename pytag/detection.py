@@ -0,0 +1,153 @@
+"""Audio format detection.
+
+The format is detected from the first bytes of the file, looking for the
+signatures of the supported formats (see :py:data:`SIGNATURES`), so there is
+no need to load the libmagic database for every file. libmagic (from the
+optional `filemagic <https://pypi.python.org/pypi/filemagic>`_ package) is
+only used, if it is installed, when no signature is found. The libmagic
+handles are reused, see :py:class:`MagicPool`.
+"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+
+try:
+    import magic
+except ImportError:  # pragma: no cover
+    magic = None
+
+from pytag.codecs import Vorbis, Opus, MpegFrame
+
+
+#: Bytes read from the beginning of the file to detect the format.
+HEADER_SIZE = 512
+
+#: File extensions of the supported formats.
+EXTENSIONS = frozenset(('.ogg', '.oga', '.opus', '.mp3'))
+
+
+def _is_ogg(signature):
+
+    def test(header):
+        # Payload of the first page, and of the beginning of stream pages
+        # after it (in multiplexed files, like Ogg Skeleton ones)
+        offset = 0
+        while (len(header) >= offset + 27 and
+               header[offset:offset + 4] == b'OggS' and
+               (offset == 0 or header[offset + 5] & 2)):
+            start = offset + 27 + header[offset + 26]
+            if header[start:start + len(signature)] == signature:
+                return True
+            offset = start + sum(header[offset + 27:start])
+        return False
+
+    return test
+
+
+def _is_mp3(header):
+    if header[:3] == b'ID3':
+        return True
+    try:
+        MpegFrame(header)
+    except ValueError:
+        return False
+    return True
+
+
+#: Signatures of the supported formats: ``(mimetype, test)``, where ``test``
+#: is called with the first :py:data:`HEADER_SIZE` bytes of the file (or
+#: less if the file is shorter), and returns ``True`` if the file has that
+#: format. The first matching mimetype is used.
+SIGNATURES = [
+    ('audio/ogg', _is_ogg(Vorbis.id_signature)),
+    ('audio/opus', _is_ogg(Opus.id_signature)),
+    ('audio/mpeg', _is_mp3),
+]
+
+
+class MagicPool:
+    """Pool of libmagic handles, shared by all the threads. Loading the magic
+    database is slow, so handles are created only when they are needed (the
+    first time, or when all of them are being used by other threads), and
+    reused after that.
+
+    ::
+
+        with pool.handle() as m:
+            mimetype = m.id_filename(path)
+
+    :param flags: libmagic flags of the handles.
+    """
+
+    def __init__(self, flags=0):
+        self.flags = flags
+        self._handles = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def handle(self):
+        """Gets a handle, only used by the current thread until the ``with``
+        block ends.
+        """
+
+        with self._lock:
+            handle = self._handles.pop() if self._handles else None
+        if handle is None:
+            handle = magic.Magic(flags=self.flags)
+
+        try:
+            yield handle
+        finally:
+            with self._lock:
+                self._handles.append(handle)
+
+    def close(self):
+        """Closes the handles not in use, called at exit."""
+
+        with self._lock:
+            handles, self._handles = self._handles, []
+        for handle in handles:
+            handle.close()
+
+
+#: Handles used by :py:func:`detect_file`, ``None`` if libmagic is not
+#: installed.
+magic_pool = None
+if magic is not None:
+    magic_pool = MagicPool(magic.MAGIC_MIME_TYPE)
+    atexit.register(magic_pool.close)
+
+
+def detect(header):
+    """Detects the format from the first bytes of a file.
+
+    :param header: The first bytes of the file.
+    :type header: ``bytes``
+    :returns: The mimetype, or ``None`` if the format is not known.
+    """
+
+    for mimetype, test in SIGNATURES:
+        if test(header):
+            return mimetype
+
+    return None
+
+
+def detect_file(path):
+    """Detects the format of a file, using libmagic (if it is installed)
+    when the signature of the file is not known.
+
+    :param path: Path of the file.
+    :returns: The mimetype, ``application/octet-stream`` if the format is
+        not known.
+    """
+
+    with open(path, 'rb') as input_file:
+        mimetype = detect(input_file.read(HEADER_SIZE))
+
+    if mimetype is None and magic_pool is not None:
+        with magic_pool.handle() as m:
+            mimetype = m.id_filename(path)
+
+    return mimetype or 'application/octet-stream'
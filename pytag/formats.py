@@ -1,16 +1,16 @@
 import collections
 import struct
 import io
-import tempfile
-import shutil
 import logging
-from array import array
+import zlib
 
 from pytag import utils
 from pytag.containers import OggReader, Ogg
-from pytag.codecs import Vorbis, Opus
+from pytag.codecs import Vorbis, Opus, MpegFrame, MpegInfo
+from pytag.structures import Padding
 from pytag.constants import (ID3_ENCODINGS, ID3_GENRES, FIELD_NAMES,
-                             TAG_ID3_V22, TAG_ID3_V23, TAG_ID3_V24)
+                             TAG_ID3_V22, TAG_ID3_V23, TAG_ID3_V24,
+                             TAG_APE, SYNC_NONE)
 
 
 log = logging.getLogger('pytag')
@@ -32,238 +32,808 @@ class OggOpus(Opus, Ogg):
     pass
 
 
-Id3Frame = collections.namedtuple('Id3Frame', ['comment', 'size'])
+#: Where a ID3v2 frame is. The offset is where the frame content starts in
+#: the file, after the frame header (if the whole tag is unsynchronised, the
+#: position after undoing the unsynchronisation). The size and the content
+#: are the ones stored in the tag, before undoing the frame encodings given
+#: by the flags.
+Id3FrameInfo = collections.namedtuple('Id3FrameInfo',
+                                      ['id', 'offset', 'size', 'flags'])
+
+# ID3v2 header, after the "ID3" identifier: version, flags and size
+id3_header_struct = struct.Struct('> B B B 4s')
+
+# ID3v2 frame headers: identifier, size and flags
+id3_frame_structs = {2: struct.Struct('> 3s 3s 0s'),
+                     3: struct.Struct('> 4s I H'),
+                     4: struct.Struct('> 4s 4s H')}
+
+# APEv2 footer: preamble, version, size (items and footer), item count and
+# flags
+ape_footer_struct = struct.Struct('< 8s I I I I 8x')
+
+# APEv2 item: value size and flags
+ape_item_struct = struct.Struct('< I I')
+
+
+def _decode_genre(text):
+
+    try:
+        genres = []
+        for code in text.split(')('):
+            code = int(code.strip('()'))
+            genres.append(ID3_GENRES[code])
+
+        if len(genres) == 1:
+            return genres[0]
+
+        return genres
+    except:
+        return text
+
+
+def _decode_date(text):
+    return text[:4]
+
+
+#: Supported ID3v2 text frames, for every mayor version:
+#: ``{frame identifier: (field name, decoder)}``. The decoder gets the frame
+#: text, ``None`` if the text is used as it is.
+id3_fields = {
+    mayor: {frame_id.encode(): (field_name, {'genre': _decode_genre,
+                                             'date': _decode_date
+                                             }.get(field_name))
+            for frame_id, field_name in zip(frame_ids, FIELD_NAMES)}
+    for mayor, frame_ids in ((2, TAG_ID3_V22), (3, TAG_ID3_V23),
+                             (4, TAG_ID3_V24))}
 
 
 class Mp3Reader:
 
+    #: Maximum number of bytes read at once from the ID3v2 tag.
+    read_ahead = 64 * 1024
+
+    #: Bytes read from the end of the file to look for ID3v1, TAG+ and
+    #: APEv2 tags.
+    tail_size = 4 * 1024
+
+    #: Maximum number of MPEG frames used to estimate the bitrate of files
+    #: without a VBR header.
+    estimate_frames = 64
+
     def __init__(self, path):
         self.path = path
 
-    def get_tags(self):
+    def get_tags(self, fields=None):
+        """Reads the tags, from the ID3v2 tag if there is one, if not, from
+        the tags at the end of the file.
+
+        :param fields: If given, only these tags are decoded, and the ID3v2
+            frames are read until all of them are found. Names are not case
+            sensitive.
+        :returns: The tags. If a frame is repeated, only the first value is
+            returned.
+        :rtype: ``dict``
+        """
+
+        if fields is not None:
+            fields = {field.lower() for field in fields}
 
         tags = {}
         with open(self.path, 'rb') as self.input_file:
 
             if self._has_id3v2_tags():
-                tags = self._read_id3v2_tags()
-            elif self._has_id3v1_tags():
-                tags = self._read_id3v1_tags()
+                tags = self._read_id3v2_tags(fields)
+            else:
+                tags, tail_start = self._read_tail_tags()
+                if fields is not None:
+                    tags = {name: value for name, value in tags.items()
+                            if name in fields}
 
         return tags
 
-    def _has_id3v1_tags(self):
-        self.input_file.seek(0, io.SEEK_END)
-        if self.input_file.tell() > 128:
-            self.input_file.seek(-128, io.SEEK_END)
-            (tag, ) = struct.unpack('> 3s', self.input_file.read(3))
-            if tag == b'TAG':
-                return True
+    def get_info(self):
+        """Gets the MPEG audio stream properties. Only the first audio frame
+        is needed if it has a Xing/Info or VBRI header, if not, the duration
+        is estimated from the size of the audio and the average bitrate of
+        the first :py:attr:`estimate_frames` frames. No more than
+        :py:attr:`read_ahead` bytes are read after the ID3v2 tag.
 
-        return False
+        :rtype: ``pytag.codecs.MpegInfo``
+        :raises ValueError: If there is no MPEG audio frame.
+        """
+
+        with open(self.path, 'rb') as self.input_file:
+
+            start = 0
+            if self._has_id3v2_tags():
+                mayor, size = self._read_id3v2_header()
+                start = 10 + size + (10 if self.id3v2_flags & 0x10 else 0)
+
+            tags, end = self._read_tail_tags()
+            self.input_file.seek(start)
+            block = self.input_file.read(min(self.read_ahead, end - start))
+
+        frame = self._find_mpeg_frame(block)
+        audio_size = end - start - frame.offset
+        vbr_header = frame.vbr_header()
+
+        if vbr_header and vbr_header[1]:
+            identifier, frames, size, delay, padding = vbr_header
+            samples = frames * frame.samples
+            duration = max(samples - delay - padding, 0) / frame.sample_rate
+            bitrate = round((size or audio_size) * 8 * frame.sample_rate /
+                            samples)
+        else:
+            identifier, delay, padding = None, 0, 0
+            bitrates = []
+            offset = frame.offset
+            while len(bitrates) < self.estimate_frames:
+                try:
+                    next_frame = MpegFrame(block, offset)
+                except ValueError:
+                    break
+                bitrates.append(next_frame.bitrate)
+                offset += next_frame.size
+
+            bitrate = round(sum(bitrates) / len(bitrates))
+            duration = audio_size * 8 / bitrate
+            frames = round(duration * frame.sample_rate / frame.samples)
+
+        return MpegInfo(version=frame.version, layer=frame.layer,
+                        sample_rate=frame.sample_rate,
+                        channels=frame.channels, bitrate=bitrate,
+                        duration=duration, frames=frames,
+                        vbr_header=identifier, encoder_delay=delay,
+                        encoder_padding=padding)
+
+    def get_duration(self):
+        """Gets the duration, see :py:meth:`get_info`.
+
+        :returns: Duration in seconds.
+        :rtype: ``float``
+        """
+
+        return self.get_info().duration
+
+    @staticmethod
+    def _find_mpeg_frame(data):
+        """Finds the first MPEG audio frame. A frame is only valid if the
+        next one (when it is in ``data``) is valid too, to skip false frame
+        syncs.
+
+        :param data: The audio, after the ID3v2 tag.
+        :rtype: ``pytag.codecs.MpegFrame``
+        :raises ValueError: If there is no frame.
+        """
+
+        position = data.find(b'\xff')
+        while position >= 0:
+            try:
+                frame = MpegFrame(data, position)
+                next_offset = position + frame.size
+                if (next_offset + 4 > len(data) or
+                        MpegFrame(data, next_offset).sample_rate ==
+                        frame.sample_rate):
+                    return frame
+            except ValueError:
+                pass
+            position = data.find(b'\xff', position + 1)
+
+        raise ValueError('No MPEG audio frame found')
 
     def _has_id3v2_tags(self):
         (id3, ) = struct.unpack('> 3s', self.input_file.read(3))
         return id3 == b'ID3'
 
-    def _read_id3v1_tags(self):
-        tags = {}
-
-        title = self._remove_padding(self.input_file.read(30))
-        if title:
-            tags['title'] = title
-
-        artist = self._remove_padding(self.input_file.read(30))
-        if artist:
-            tags['artist'] = artist
+    def _read_tail_tags(self):
+        """Reads the tags at the end of the file: ID3v1 (with the Enhanced
+        TAG+ extension) and APEv2, using only one read call of the last
+        ``tail_size`` bytes (unless the APEv2 tag is bigger). APEv2 values
+        have preference over the ID3v1 ones, which are truncated.
 
-        album = self._remove_padding(self.input_file.read(30))
-        if album:
-            tags['album'] = album
+        :returns: The tags, and where the ID3v1 tag (or the TAG+ extension)
+            starts, the end of the file if there is not one.
+        :rtype: ``tuple``
+        """
 
-        date = self._remove_padding(self.input_file.read(4))
-        if date:
-            tags['date'] = date
+        file_size = self.input_file.seek(0, io.SEEK_END)
+        tail_start = max(0, file_size - self.tail_size)
+        self.input_file.seek(tail_start)
+        tail = memoryview(self.input_file.read())
 
-        self.input_file.seek(29, io.SEEK_CUR)  # Ignore comments
+        tags = {}
+        end = len(tail)
+        if end >= 128 and tail[end - 128:end - 125] == b'TAG':
+            end -= 128
+            tags = self._parse_id3v1_tags(tail[end:])
+            if end >= 227 and tail[end - 227:end - 223] == b'TAG+':
+                end -= 227
+                self._parse_tag_plus(tail[end:end + 227], tags)
+        id3v1_start = tail_start + end
+
+        # APEv2 footer, at the end or before the ID3v1 tag
+        if end >= 32 and tail[end - 32:end - 24] == b'APETAGEX':
+            (preamble, version, size, count,
+             flags) = ape_footer_struct.unpack_from(tail, end - 32)
+            items_start = end - size
+            if items_start >= 0:
+                items = tail[items_start:end - 32]
+            elif tail_start + items_start >= 0:  # Bigger than the tail
+                self.input_file.seek(tail_start + items_start)
+                items = self.input_file.read(size - 32)
+            else:  # pragma: no cover
+                log.info('APEv2 tag out of the file')
+                items = b''
+            tags.update(self._parse_ape_items(items, count))
+
+        tail.release()
+        return tags, id3v1_start
+
+    def _parse_id3v1_tags(self, data):
+        """Decodes a ID3v1 tag (ID3v1.1 if it has a track number).
+
+        :param data: The 128 bytes of the tag.
+        :rtype: ``dict``
+        """
 
-        tracknumber = int.from_bytes(self.input_file.read(1), byteorder='big')
+        tags = {}
+        for name, start, end in (('title', 3, 33), ('artist', 33, 63),
+                                 ('album', 63, 93), ('date', 93, 97)):
+            value = self._remove_padding(bytes(data[start:end]))
+            if value:
+                tags[name] = value
+
+        # Comments are ignored
+        tracknumber = data[126]
         if tracknumber:
             tags['tracknumber'] = tracknumber
 
-        genre = int.from_bytes(self.input_file.read(1), byteorder='big')
+        genre = data[127]
         if genre in ID3_GENRES:
             tags['genre'] = ID3_GENRES[genre]
 
         return tags
 
+    def _parse_tag_plus(self, data, tags):
+        """Decodes a Enhanced TAG+ tag, which has the next 60 characters of
+        the title, artist and album of the ID3v1 tag, and a free text genre.
+
+        :param data: The 227 bytes of the tag.
+        :param tags: The ID3v1 tags, updated with the TAG+ values.
+        """
+
+        for name, start, end in (('title', 4, 64), ('artist', 64, 124),
+                                 ('album', 124, 184)):
+            value = self._remove_padding(bytes(data[start:end]))
+            if value:
+                tags[name] = tags.get(name, '') + value
+
+        genre = self._remove_padding(bytes(data[185:215]))
+        if genre:
+            tags['genre'] = genre
+
+    def _parse_ape_items(self, items, count):
+        """Decodes the items of a APEv2 tag. Only the text items of the keys
+        in :py:data:`pytag.constants.TAG_APE` are used.
+
+        :param items: The items, between the header and the footer.
+        :param count: Number of items.
+        :rtype: ``dict``
+        """
+
+        data = bytes(items)
+        tags = {}
+        position = 0
+        for _ in range(count):
+            if position + ape_item_struct.size > len(data):
+                break
+            size, flags = ape_item_struct.unpack_from(data, position)
+            key_end = data.find(b'\x00', position + ape_item_struct.size)
+            if key_end < 0:
+                break
+            key = data[position + ape_item_struct.size:key_end]
+            position = key_end + 1 + size
+
+            field_name = TAG_APE.get(key.decode('ascii', 'replace').lower())
+            if field_name is None or flags & 0x06:  # Not UTF-8 text
+                continue
+
+            values = data[key_end + 1:position].decode(
+                'utf_8', 'replace').split('\x00')
+            tags[field_name] = values[0] if len(values) == 1 else values
+
+        return tags
+
     def _remove_padding(self, text):
         try:
             return text[:text.index(b'\x00')].decode()
         except ValueError:
             return text.decode()
 
-    def _read_id3v2_tags(self):
-        (mayor, minor) = struct.unpack('> B B', self.input_file.read(2))
-
-        #TODO Check if extended header (second bit from left), and skip
-        # In extended header, first 4 bytes are the size.
-        self.input_file.seek(1, io.SEEK_CUR)  # Flags
-
-        size = utils.decode_bitwise_int(struct.unpack('> B B B B',
-                                                      self.input_file.read(4)))
-        log.info(' Complete size: {}'.format(size))
-
-        header_size = 10  # For id3v2.3 and id3v2.4
-        if mayor == 2:
-            read_frame = self._read_id3v22_frame
-            header_size = 6
-        elif mayor == 3:
-            read_frame = self._read_id3v23_frame
-        elif mayor == 4:
-            read_frame = self._read_id3v24_frame
-        else:   # pragma: no cover
-            raise Exception('ID3 version "2.{}" not supported'.format(mayor))
+    def _read_id3v2_tags(self, fields=None):
+        """Reads the ID3v2 tag, the file cursor must be after the ``ID3``
+        identifier. The frames found are saved in ``self.frames``.
+
+        :param fields: If given, only the frames of these tags are read, and
+            only until all of them are found (so ``self.frames`` can have
+            only the first frames).
+        :returns: The supported tags.
+        :rtype: ``dict``
+        """
+
+        mayor, size = self._read_id3v2_header()
+        if fields is None:
+            self.frames, contents = self._index_id3v2_frames(
+                mayor, size, id3_fields[mayor].__contains__)
+        else:
+            frame_ids = {frame_id for frame_id, (field_name, decoder)
+                         in id3_fields[mayor].items()
+                         if field_name in fields}
+            self.frames, contents = self._index_id3v2_frames(
+                mayor, size, frame_ids.__contains__, limit=len(frame_ids))
 
         comments = {}
-        while size > 0:
+        for frame in self.frames:
+            if frame in contents:
+                comment = self._read_id3_generic_frame(
+                    frame.id, contents[frame], mayor)
+                if comment:  # Only use some frames
+                    for name, value in comment.items():
+                        comments.setdefault(name, value)
 
-            # Remaining size is less than header size, must be padding
-            if size <= header_size:
-                self.input_file.seek(size, io.SEEK_CUR)
-                break
+        return comments
 
-            frame = read_frame()
-            size -= (frame.size + header_size)
-            if frame.comment:  # Only use some frames
-                comments.update(frame.comment)
+    def _read_id3v2_header(self):
+        """Reads the ID3v2 header, the file cursor must be after the ``ID3``
+        identifier.
 
-            elif frame.size == 0:  # Padding at the end of the frames
-                log.info('Found padding: {} bytes'.format(frame.size + size))
-                self.input_file.seek(size, io.SEEK_CUR)
-                size = 0
+        :returns: The mayor version and the size of the tag (without header
+            and footer).
+        :rtype: ``tuple``
+        """
 
-        return comments
+        (mayor, minor, flags, size) = id3_header_struct.unpack(
+            self.input_file.read(id3_header_struct.size))
+        size = utils.decode_bitwise_int(size)
+        log.info(' Complete size: %s', size)
 
-    def _decode_genre(self, text):
+        if mayor not in (2, 3, 4):   # pragma: no cover
+            raise Exception('ID3 version "2.{}" not supported'.format(mayor))
 
-        try:
-            genres = []
-            for code in text.split(')('):
-                code = int(code.strip('()'))
-                genres.append(ID3_GENRES[code])
+        self.id3v2_flags = flags
+        return mayor, size
+
+    def _index_id3v2_frames(self, mayor, size, wanted, limit=None):
+        """Finds the frames in a ID3v2 tag, the file cursor must be after the
+        header. The tag is read in blocks of ``read_ahead`` bytes (so small
+        tags are read with only one read call), frames which don't fit in the
+        current block and are not wanted are skipped without reading them.
+        When this method returns, the file cursor is after the tag.
+
+        The extended header is skipped. If the whole tag is unsynchronised
+        (ID3v2.2 and ID3v2.3), it is read at once and the unsynchronisation
+        is undone before looking for the frames, so the frame offsets are
+        positions in the tag without unsynchronisation. The content of the
+        wanted frames is returned without the ID3v2.3/ID3v2.4 frame encodings
+        (unsynchronisation, compression...), see :py:meth:`_decode_frame`.
+
+        :param mayor: ID3v2 mayor version.
+        :param size: Size of the tag, without the header.
+        :param wanted: Called with every frame identifier, returns ``True``
+            if the frame content is needed.
+        :param limit: If given, the tag is read only until the content of
+            this number of different frames has been found.
+        :returns: Where every frame is, and the content of the wanted frames.
+        :rtype: ``tuple`` with a ``list`` of ``Id3FrameInfo`` and a ``dict``
+            of ``Id3FrameInfo: bytes-like object``
+        """
+
+        frame_header = id3_frame_structs[mayor]
+        tag_start = self.input_file.tell()
+        tag_end = end = tag_start + size
+
+        def read_block(position, size=0):
+            self.input_file.seek(position)
+            return position, memoryview(self.input_file.read(
+                max(size, min(self.read_ahead, tag_end - position))))
+
+        frames = []
+        contents = {}
+        position = tag_start
+
+        if mayor == 2 and self.id3v2_flags & 0x40:
+            log.info('Compressed ID3v2.2 tag, frames not read')
+            self.input_file.seek(tag_end)
+            return frames, contents
+
+        if mayor < 4 and self.id3v2_flags & 0x80:
+            block = self._read_unsynchronised(size)
+            block_start, end = tag_start, tag_start + len(block)
+        else:
+            block_start, block = tag_start, memoryview(self.input_file.read(
+                min(self.read_ahead, size)))
+
+        if mayor > 2 and self.id3v2_flags & 0x40 and len(block) >= 4:
+            if mayor == 3:  # Size without the size field
+                position += 4 + int.from_bytes(block[:4], byteorder='big')
+            else:
+                position += utils.decode_bitwise_int(block[:4])
+            log.info('Found extended header: %s bytes', position - tag_start)
 
-            if len(genres) == 1:
-                return genres[0]
+        found = set()
+        while position + frame_header.size <= end:
 
-            return genres
-        except:
-            return text
+            if limit is not None and len(found) >= limit:
+                break
 
-    @staticmethod
-    def as_field(frame_id, id3_type):
+            if position + frame_header.size > block_start + len(block):
+                block_start, block = read_block(position)
+            start = position - block_start
 
-        id_ = frame_id.decode()
+            # Padding at the end of the frames
+            if block[start] == 0:
+                log.info('Found padding: %s bytes', end - position)
+                break
+
+            (frame_id, size, flags) = frame_header.unpack_from(block, start)
+            if mayor == 2:
+                size, flags = int.from_bytes(size, byteorder='big'), 0
+            elif mayor == 4:
+                size = utils.decode_bitwise_int(size)
+
+            offset = position + frame_header.size
+            if offset + size > end:  # pragma: no cover
+                log.info('Frame "%s" out of the tag', frame_id)
+                break
 
-        if id3_type == 2:
-            id3 = TAG_ID3_V22
-        elif id3_type == 3:
-            id3 = TAG_ID3_V23
-        elif id3_type == 4:
-            id3 = TAG_ID3_V24
+            frame = Id3FrameInfo(id=frame_id, offset=offset, size=size,
+                                 flags=flags)
+            frames.append(frame)
+
+            if wanted(frame_id) and frame_id not in found:
+                if offset + size > block_start + len(block):
+                    block_start, block = read_block(offset, size)
+                start = offset - block_start
+                content = block[start:start + size]
+                if flags or mayor == 4 and self.id3v2_flags & 0x80:
+                    content = self._decode_frame(content, mayor, flags)
+                if content is not None:
+                    contents[frame] = content
+                    if limit is not None:
+                        found.add(frame_id)
+
+            position = offset + size
+
+        footer = 10 if self.id3v2_flags & 0x10 else 0  # Only in id3v2.4
+        if self.input_file.tell() != tag_end + footer:
+            self.input_file.seek(tag_end + footer)
+
+        return frames, contents
+
+    def _read_unsynchronised(self, size):
+        """Reads a unsynchronised tag, or part of it, and undoes the
+        unsynchronisation (every ``0xFF 0x00`` becomes ``0xFF``).
+
+        :param size: Bytes to read.
+        :rtype: ``memoryview``
+        """
+
+        return memoryview(self.input_file.read(size).replace(b'\xff\x00',
+                                                             b'\xff'))
+
+    def _decode_frame(self, content, mayor, flags):
+        """Undoes the encodings of a ID3v2.3 or ID3v2.4 frame, given by the
+        frame flags: the extra bytes after the frame header (decompressed
+        size, group identifier...) are removed, and the unsynchronisation
+        (only ID3v2.4) and the compression are undone.
+
+        :param content: Frame content, as found in the tag.
+        :param mayor: ID3v2 mayor version.
+        :param flags: Frame flags.
+        :returns: The frame content, or ``None`` if it can't be decoded
+            (encrypted frames).
+        """
+
+        if mayor == 3:
+            compressed, encrypted = flags & 0x80, flags & 0x40
+            unsynchronised = False
+            extra = 4 * bool(compressed) + bool(encrypted) + bool(flags & 0x20)
+        else:
+            compressed, encrypted = flags & 0x08, flags & 0x04
+            unsynchronised = flags & 0x02 or self.id3v2_flags & 0x80
+            extra = bool(flags & 0x40) + bool(encrypted) + 4 * (flags & 0x01)
+
+        if encrypted:
+            log.info('Encrypted frame, not read')
+            return None
+
+        content = content[extra:]
+        if unsynchronised:
+            content = bytes(content).replace(b'\xff\x00', b'\xff')
+        if compressed:
+            try:
+                content = zlib.decompress(content)
+            except zlib.error:
+                log.info('Wrong compressed frame, not read')
+                return None
+
+        return content
+
+    def get_frames(self):
+        """Gets where the ID3v2 frames are, without reading their content.
+
+        :returns: Where every frame is.
+        :rtype: ``list`` of ``Id3FrameInfo``
+        """
 
-        index = id3.index(id_)
+        with open(self.path, 'rb') as self.input_file:
+            if not self._has_id3v2_tags():
+                return []
+            mayor, size = self._read_id3v2_header()
+            self.frames, contents = self._index_id3v2_frames(
+                mayor, size, lambda frame_id: False)
+
+        return self.frames
+
+    def copy_frame(self, frame, fileobj, buffer_size=utils.BUFFER_SIZE):
+        """Copies the content of a frame to a file, in chunks. Useful to get
+        big binary frames, like the cover art (``APIC`` frame). The content
+        is copied as stored in the tag, the frame encodings given by the
+        frame flags are not undone.
+
+        :param frame: The frame, from :py:meth:`get_frames`.
+        :type frame: ``Id3FrameInfo``
+        :param fileobj: Binary file to write to.
+        :returns: Number of bytes copied.
+        :rtype: ``int``
+        """
 
-        return FIELD_NAMES[index]
+        with open(self.path, 'rb') as self.input_file:
 
-    def _read_id3_generic_frame(self, frame_id, size, id3_type):
+            # Offsets of unsynchronised tags are not positions in the file
+            if self._has_id3v2_tags():
+                mayor, size = self._read_id3v2_header()
+                if mayor < 4 and self.id3v2_flags & 0x80:
+                    start = frame.offset - 10
+                    return fileobj.write(self._read_unsynchronised(size)[
+                        start:start + frame.size])
 
-        if size == 0:
-            return Id3Frame(None, 0)
+            self.input_file.seek(frame.offset)
+            return utils.copy_stream(self.input_file, fileobj, frame.size,
+                                     buffer_size)
 
-        log.info('Found frame: "{}" for id3 version 2.{}'.format(frame_id,
-                                                                 id3_type))
+    @staticmethod
+    def as_field(frame_id, id3_type):
+        """Gets the field name of a frame.
 
-        (encoding, ) = struct.unpack('> B', self.input_file.read(1))
+        :param frame_id: Frame identifier, as ``bytes``.
+        :param id3_type: ID3v2 mayor version.
+        :raises ValueError: If the frame is not supported.
+        """
 
         try:
-            field_name = self.as_field(frame_id, id3_type)
+            return id3_fields[id3_type][frame_id][0]
+        except KeyError:
+            raise ValueError('Frame "{}" not supported'.format(frame_id))
 
-            data = self.input_file.read(size-1)
-            data = data.decode(ID3_ENCODINGS[encoding])
+    def _read_id3_generic_frame(self, frame_id, data, id3_type):
+        """Decodes a text frame.
 
-            # Special cases
-            if field_name == 'genre':
-                data = self._decode_genre(data)
-            elif field_name == 'date':
-                data = data[:4]
+        :param frame_id: Frame identifier.
+        :param data: Frame content.
+        :param id3_type: ID3v2 mayor version.
+        :returns: ``{field name: value}``, or ``None`` if the frame is not
+            supported.
+        """
 
-            data = {field_name: data}
-            return Id3Frame(data, size)
+        field = id3_fields[id3_type].get(frame_id)
+        if field is None or not data:
+            return None
 
-        except ValueError:
-            self.input_file.seek(size - 1, io.SEEK_CUR)
-            return Id3Frame(None, size)
+        log.info('Found frame: "%s" for id3 version 2.%s', frame_id, id3_type)
 
-    def _read_id3v22_frame(self):
-        (frame_id, ) = struct.unpack('> 3s ', self.input_file.read(3))
-        size = int.from_bytes(self.input_file.read(3), byteorder='big')
-        return self._read_id3_generic_frame(frame_id, size, 2)
+        field_name, decoder = field
+        try:
+            data = bytes(data[1:]).decode(ID3_ENCODINGS[data[0]])
+        except (ValueError, IndexError):
+            return None
 
-    def _read_id3v23_frame(self):
-        (frame_id, ) = struct.unpack('> 4s ', self.input_file.read(4))
-        (size, ) = struct.unpack('> I', self.input_file.read(4))
+        if decoder is not None:
+            data = decoder(data)
 
-        self.input_file.seek(2, io.SEEK_CUR)  # Flags, not used
+        return {field_name: data}
 
-        return self._read_id3_generic_frame(frame_id, size, 3)
 
-    def _read_id3v24_frame(self):
-        (frame_id, ) = struct.unpack('> 4s ', self.input_file.read(4))
-        size = utils.decode_bitwise_int(struct.unpack('> B B B B',
-                                                      self.input_file.read(4)))
+class Mp3(Mp3Reader):
 
-        self.input_file.seek(2, io.SEEK_CUR)  # Flags, not used
+    #: Buffer size used to copy the audio data when the file is rewritten.
+    buffer_size = utils.BUFFER_SIZE
 
-        return self._read_id3_generic_frame(frame_id, size, 4)
+    #: Durability policy, see :py:data:`pytag.constants.SYNC_NONE`.
+    sync = SYNC_NONE
 
+    #: Free space reserved after the frames when the file is rewritten.
+    padding = Padding(1024)
 
-class Mp3(Mp3Reader):
+    def write_tags(self, comments, merge=False):
+        """Writes the tags in a ID3v2 tag, the ID3v1 tag (and TAG+) is removed.
+
+        If the new tag fits in the space used by the old ID3v2 tag (including
+        its padding), only that space is overwritten. If not, the whole file
+        is rewritten, and some padding is added to the new tag, see
+        :py:attr:`padding`.
 
-    def write_tags(self, comments):
+        :param comments: The tags.
+        :param merge: If ``False``, the old tag is replaced by a new ID3v2.4
+            tag with only the given tags. If ``True``, only the frames of the
+            given tags are replaced (a ``None`` value removes the frame), the
+            rest of the frames (also the not supported ones, like the cover
+            art) are copied byte by byte, and the ID3v2 version of the old tag
+            is kept. The frames before the first changed frame are not even
+            read.
+        :raises ValueError: If ``merge`` is ``True`` and the frames of the old
+            tag can't be read (compressed ID3v2.2 tags), so they would be
+            lost.
+        """
 
-        with tempfile.NamedTemporaryFile('wb', delete=False) as output_file,\
+        with open(self.path, 'rb') as self.input_file:
+
+            # Audio starts after id3v2 tags
+            start = 0
+            mayor, flags, frames, rebuild = 4, 0, [], 0
+            if self._has_id3v2_tags():
+                mayor, tag_size = self._read_id3v2_header()
+                start = 10 + tag_size + (10 if self.id3v2_flags & 0x10 else 0)
+                if merge and mayor == 2 and self.id3v2_flags & 0x40:
+                    raise ValueError('Compressed ID3v2.2 tags can not be '
+                                     'merged')
+                if merge:
+                    frames, contents = self._index_id3v2_frames(
+                        mayor, tag_size, lambda frame_id: False)
+                    # Footer, extended header and unsynchronisation of the
+                    # whole tag are not kept, so all the frames are moved
+                    flags = self.id3v2_flags & ~0xD0
+                    rebuild = self.id3v2_flags & 0xC0
+                else:
+                    mayor = 4
+
+            # Audio ends before id3v1 tags (and TAG+)
+            size = self.input_file.seek(0, io.SEEK_END)
+            tail_tags, end = self._read_tail_tags()
+            if merge and not frames and not start:
+                # Only the first value of multi-value APEv2 items, as for
+                # repeated frames
+                old_comments = {
+                    key: str(value[0] if isinstance(value, list) else value)
+                    for key, value in tail_tags.items()}
+                old_comments.update(comments)
+                comments = old_comments
+
+            # Frames before the first changed frame are kept as they are
+            changed = self._frame_ids(comments, mayor)
+            header_size = id3_frame_structs[mayor].size
+            kept = [frame for frame in frames if frame.id not in changed]
+            prefix = 0 if rebuild else next(
+                (index for index, frame in enumerate(frames)
+                 if frame.id in changed), len(frames))
+            if prefix:
+                last = frames[prefix - 1]
+                prefix_end = last.offset + last.size
+            elif frames and not rebuild:
+                prefix_end = frames[0].offset - header_size
+            else:
+                prefix_end = 10
+
+            # The rest of the unchanged frames are copied as byte slices
+            moved = kept[prefix:]
+            tail = bytearray()
+            if moved:
+                block_start = 10 if rebuild else prefix_end
+                self.input_file.seek(block_start)
+                block_size = moved[-1].offset + moved[-1].size - block_start
+                if mayor < 4 and self.id3v2_flags & 0x80:
+                    block = self._read_unsynchronised(tag_size)
+                else:
+                    block = memoryview(self.input_file.read(block_size))
+                for frame in moved:
+                    frame_start = frame.offset - header_size - block_start
+                    tail += block[frame_start:frame_start + header_size +
+                                  frame.size]
+                    if mayor == 4 and self.id3v2_flags & 0x80:
+                        tail[-frame.size - 1] |= 0x02  # Frame unsynchronised
+                block.release()
+
+        tail += self._encode_frames(comments, mayor)
+        frames_size = prefix_end - 10 + len(tail)
+
+        if frames_size and 10 + frames_size <= start:
+            with open(self.path, 'r+b') as output_file:
+                output_file.write(self._id3v2_header(mayor, flags, start - 10))
+                output_file.seek(prefix_end)
+                output_file.write(tail)
+                output_file.write(bytes(start - prefix_end - len(tail)))
+                if end != size:
+                    output_file.truncate(end)
+                if self.sync:
+                    utils.fsync(output_file)
+            return
+
+        with utils.replace_file(self.path, self.sync) as output_file,\
                 open(self.path, 'rb') as self.input_file:
 
-            # Write tags if at least has one supported value
-            tags = array('B')
-            for key, value in comments.items():
-                if key in FIELD_NAMES:
+            if frames_size:
+                padding = self.padding(frames_size)
+                output_file.write(self._id3v2_header(mayor, flags,
+                                                     frames_size + padding))
+                self.input_file.seek(10)
+                utils.copy_stream(self.input_file, output_file,
+                                  prefix_end - 10,
+                                  buffer_size=self.buffer_size)
+                output_file.write(tail)
+                output_file.write(bytes(padding))
+
+            self.input_file.seek(start)
+            utils.copy_stream(self.input_file, output_file, end - start,
+                              buffer_size=self.buffer_size)
 
-                    frame = array('B',
-                                  TAG_ID3_V24[FIELD_NAMES.index(key)].encode())
-                    frame.extend([0]*6)  # Size and flags
-                    frame.append(3)      # Encoding
-                    frame.extend(value.encode())
-                    frame[4:8] = utils.encode_bitwise_int(len(frame) - 10)
+    @staticmethod
+    def _frame_ids(comments, mayor):
+        """Gets the frame identifiers used by some tags.
 
-                    tags.extend(frame)
+        :param comments: The tags.
+        :param mayor: ID3v2 mayor version.
+        :rtype: ``set`` of ``bytes``
+        """
 
-            if len(tags):
-                output_file.write(b'ID3\x04\x00\x00')
-                output_file.write(utils.encode_bitwise_int(len(tags)))
-                output_file.write(tags)
+        id3 = (TAG_ID3_V22, TAG_ID3_V23, TAG_ID3_V24)[mayor - 2]
+        return {id3[FIELD_NAMES.index(key)].encode() for key in comments
+                if key in FIELD_NAMES}
 
-            # Position input file cursor after id3v2 tags
-            if self._has_id3v2_tags():
-                self._read_id3v2_tags()
-            else:
-                self.input_file.seek(0)
+    @staticmethod
+    def _encode_frames(comments, mayor):
+        """Creates the text frames for some tags. ID3v2.4 frames are encoded
+        as UTF-8, older versions don't support it, so UTF-16 is used.
+
+        :param comments: The tags, tags with a ``None`` value are ignored.
+        :param mayor: ID3v2 mayor version.
+        :rtype: ``bytearray``
+        """
+
+        id3 = (TAG_ID3_V22, TAG_ID3_V23, TAG_ID3_V24)[mayor - 2]
+        frame_header = id3_frame_structs[mayor]
+
+        frames = bytearray()
+        for key, value in comments.items():
+            if key in FIELD_NAMES and value is not None:
+                if mayor == 4:
+                    content = b'\x03' + value.encode()
+                else:
+                    content = b'\x01' + value.encode('utf_16')
+
+                size = len(content)
+                if mayor == 2:
+                    size, flags = size.to_bytes(3, byteorder='big'), b''
+                elif mayor == 3:
+                    flags = 0
+                else:
+                    size, flags = bytes(utils.encode_bitwise_int(size)), 0
+
+                frames += frame_header.pack(
+                    id3[FIELD_NAMES.index(key)].encode(), size, flags)
+                frames += content
+
+        return frames
 
-            output_file.write(self.input_file.read())
+    @staticmethod
+    def _id3v2_header(mayor, flags, size):
+        """Creates a ID3v2 header.
 
-            if self._has_id3v1_tags():
-                output_file.seek(-128, io.SEEK_END)
-                output_file.truncate()
+        :param mayor: ID3v2 mayor version.
+        :param flags: Header flags.
+        :param size: Size of the tag without header.
+        :rtype: ``bytes``
+        """
 
-        shutil.move(output_file.name, self.path)
+        return b'ID3' + id3_header_struct.pack(
+            mayor, 0, flags, bytes(utils.encode_bitwise_int(size)))
@@ -1,17 +1,22 @@
-import magic
+import os
 
+from pytag import aio, detection
 from pytag.structures import PytagDict
 from pytag.constants import FIELD_NAMES
-from pytag.formats import OggVorbisReader, OggVorbis, Mp3Reader, Mp3
+from pytag.formats import (OggVorbisReader, OggVorbis, OggOpusReader,
+                           OggOpus, Mp3Reader, Mp3)
 
 
 MIMETYPE = {'application/ogg': (OggVorbisReader, OggVorbis),
+            'audio/ogg': (OggVorbisReader, OggVorbis),
+            'audio/opus': (OggOpusReader, OggOpus),
             'audio/mpeg': (Mp3Reader, Mp3)
             }
 
 
 class Tag:
-    """Descriptor class.
+    """Descriptor class. Only the tag of the descriptor is read from the file
+    the first time it is used.
     """
 
     def __init__(self, name):
@@ -25,10 +30,8 @@ class Tag:
         try:
             return instance.__dict__[self.name]
         except KeyError:
-            tags = instance.get_tags()
-            for name in (set(tags) ^ set(FIELD_NAMES)):
-                instance.__dict__[name] = None
-            return instance.__dict__[self.name]
+            tags = instance.get_tags(fields=(self.name, ))
+            return tags.get(self.name)
 
     def __set__(self, instance, value):
         instance.__dict__[self.name] = value
@@ -47,14 +50,21 @@ class MetaAudio(type):
 class AudioReader(metaclass=MetaAudio):
     """High level interface for pytag. Creates a new object if the audio format
     is supported, or returns a :py:exc:`pytag.FormatNotSupportedError` if not.
+
+    :param path: Path of the file.
+    :param mimetype: Format of the file, if it is already known. If not, it
+        is detected, see :py:func:`pytag.detection.detect_file`.
+    :param cache: A :py:class:`pytag.cache.TagCache`, to get the tags from
+        it if the file has not changed.
     """
 
     _index = 0
 
-    def __init__(self, path):
+    def __init__(self, path, mimetype=None, cache=None):
 
-        with magic.Magic(flags=magic.MAGIC_MIME_TYPE) as m:
-            self.mimetype = m.id_filename(path)
+        self.path = path
+        self.cache = cache
+        self.mimetype = mimetype or detection.detect_file(path)
 
         try:
             self._format = MIMETYPE[self.mimetype][self._index](path)
@@ -62,13 +72,48 @@ class AudioReader(metaclass=MetaAudio):
             raise FormatNotSupportedError(
                 '"{0}" type is not supported'.format(self.mimetype))
 
-    def get_tags(self):
-
-        tags = PytagDict(self._format.get_tags())
-        for name, value in tags.items():
-            setattr(self, name, value)
+    def get_tags(self, fields=None):
+        """Reads the tags.
+
+        :param fields: If given, only these tags are read (the file is parsed
+            only until all of them are found). Names are not case
+            sensitive. The tags not found are set to ``None``.
+        :rtype: ``pytag.structures.PytagDict``
+
+        If there is a cache, the tags are taken from it if possible. Only
+        complete reads (without ``fields``) are saved in the cache.
+        """
+
+        if fields is not None:
+            fields = tuple(field.lower() for field in fields)
+
+        tags = None
+        if self.cache is not None:
+            stat = os.stat(self.path)
+            tags = self.cache.get(self.path, stat)
+
+        if tags is None:
+            tags = PytagDict(self._format.get_tags(fields=fields))
+            if self.cache is not None and fields is None:
+                self.cache.put(self.path, tags, stat)
+        elif fields is not None:
+            tags = PytagDict({name: value for name, value in tags.items()
+                              if name in fields})
+        else:
+            tags = PytagDict(tags)
+
+        for name in (FIELD_NAMES if fields is None else fields):
+            if name in FIELD_NAMES:
+                setattr(self, name, tags.get(name))
         return tags
 
+    async def aget_tags(self, fields=None):
+        """Coroutine version of :py:meth:`get_tags`, see
+        :py:mod:`pytag.aio`.
+        """
+
+        return await aio.default_runner.run(self.get_tags, fields)
+
 
 class Audio(AudioReader):
     """Extends :py:class:`pytag.AudioReader` and adds a ``write_tags`` method.
@@ -77,7 +122,39 @@ class Audio(AudioReader):
     _index = 1
 
     def write_tags(self, tags):
-        self._format.write_tags(PytagDict(tags))
+        try:
+            self._format.write_tags(PytagDict(tags))
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(self.path)
+
+    async def awrite_tags(self, tags):
+        """Coroutine version of ``write_tags``, see :py:mod:`pytag.aio`. If
+        the coroutine is cancelled, the tags are still written.
+        """
+
+        await aio.default_runner.run(self.write_tags, tags)
+
+
+def _read(path, fields):
+    return AudioReader(path).get_tags(fields=fields)
+
+
+async def aread(path, fields=None):
+    """Reads the tags of a file without blocking the event loop, see
+    :py:mod:`pytag.aio`.
+
+    ::
+
+        tags = await pytag.aread(path)
+
+    :param path: Path of the file.
+    :param fields: Tags to read, see :py:meth:`AudioReader.get_tags`.
+    :rtype: ``pytag.structures.PytagDict``
+    :raises FormatNotSupportedError: If the format is not supported.
+    """
+
+    return await aio.default_runner.run(_read, path, fields)
 
 
 class FormatNotSupportedError(Exception):
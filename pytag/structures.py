@@ -65,3 +65,36 @@ class PytagDict(CaseInsensitiveDict):
         key = key.lower()
         if key in FIELD_NAMES:
             self._store[key] = value
+
+
+class Padding:
+    """Policy to reserve free space when the tags are written, so later
+    changes can be written in place, without rewriting the whole file.
+
+    ::
+
+        Padding(1024)(2000) == 1024           # Fixed size
+        Padding(percent=10)(2000) == 200      # 10% of the tags size
+        Padding(1024, percent=10)(2000) == 1224
+
+    :param size: Fixed number of bytes to reserve.
+    :param percent: Extra bytes to reserve, as a percentage of the tags size.
+    """
+
+    def __init__(self, size=0, percent=0):
+        self.size = size
+        self.percent = percent
+
+    def __call__(self, tags_size):
+        """Gets the padding size.
+
+        :param tags_size: Size of the tags, without padding.
+        :returns: Number of bytes to reserve.
+        :rtype: ``int``
+        """
+
+        return self.size + tags_size * self.percent // 100
+
+    def __repr__(self):    # pragma: no cover
+        return '{}(size={}, percent={})'.format(self.__class__.__name__,
+                                                self.size, self.percent)
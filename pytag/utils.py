@@ -1,11 +1,20 @@
+import contextlib
+import io
+import os
+import shutil
 import struct
+import tempfile
 from array import array
 
-from pytag.constants import CRC_LOOKUP
+from pytag.crc import OggCRC
+from pytag.constants import SYNC_NONE, SYNC_FILE, SYNC_DIRECTORY
 
 
 int_struct = struct.Struct('< I')
 
+#: Default buffer size used to copy the audio data when a file is rewritten.
+BUFFER_SIZE = 64 * 1024
+
 
 def read_in_chunks(fileobj, chunk_size=255):
     """Read a file in chunks."""
@@ -16,20 +25,151 @@ def read_in_chunks(fileobj, chunk_size=255):
         chunk = fileobj.read(chunk_size)
 
 
+def _copy_file_range(src_fd, dst_fd, src_offset, dst_offset, count):
+    return os.copy_file_range(src_fd, dst_fd, count, src_offset, dst_offset)
+
+
+def _sendfile(src_fd, dst_fd, src_offset, dst_offset, count):
+    os.lseek(dst_fd, dst_offset, os.SEEK_SET)
+    return os.sendfile(dst_fd, src_fd, src_offset, count)
+
+
+# System calls to copy data between files without moving it through Python,
+# in order of preference. copy_file_range lets the filesystem share the data
+# blocks (reflink) if it can.
+_kernel_copies = [copy for name, copy in (('copy_file_range',
+                                           _copy_file_range),
+                                          ('sendfile', _sendfile))
+                  if hasattr(os, name)]
+
+
+def _copy_in_kernel(source, destination, size=None):
+    """Copies data between two files with a system call, if possible.
+
+    :returns: Number of bytes copied, can be less than ``size`` (or zero) if
+        the system calls are not available or supported by the files.
+    :rtype: ``int``
+    """
+
+    try:
+        src_fd, dst_fd = source.fileno(), destination.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return 0
+
+    destination.flush()
+    src_offset, dst_offset = source.tell(), destination.tell()
+    if size is None:
+        size = os.fstat(src_fd).st_size - src_offset
+
+    copied = 0
+    for copy in _kernel_copies:
+        try:
+            while copied < size:
+                n = copy(src_fd, dst_fd, src_offset + copied,
+                         dst_offset + copied, min(size - copied, 2 ** 30))
+                if not n:
+                    break
+                copied += n
+            break
+        except OSError:
+            continue
+
+    source.seek(src_offset + copied)
+    destination.seek(dst_offset + copied)
+    return copied
+
+
+def copy_stream(source, destination, size=None, buffer_size=BUFFER_SIZE):
+    """Copies data between two binary files. If both are real files, the
+    data is copied by the kernel (``copy_file_range`` or ``sendfile``),
+    otherwise, or if that fails, it is copied in chunks reusing the same
+    buffer, so the memory used doesn't depend on the amount of data copied.
+
+    :param source: File to read from, from its current position.
+    :param destination: File to write to, at its current position.
+    :param size: Number of bytes to copy, if ``None`` copy until the end of
+        ``source``.
+    :param buffer_size: Size of the chunks.
+    :returns: Number of bytes copied.
+    :rtype: ``int``
+    """
+
+    copied = 0
+    if _kernel_copies:
+        copied = _copy_in_kernel(source, destination, size)
+
+    buf = memoryview(bytearray(buffer_size))
+    while size is None or copied < size:
+        if size is not None and size - copied < buffer_size:
+            buf = buf[:size - copied]
+        n = source.readinto(buf)
+        if not n:
+            break
+        destination.write(buf[:n])
+        copied += n
+
+    return copied
+
+
+def fsync(fileobj):
+    """Flush a file and wait until its data is in the disk."""
+
+    fileobj.flush()
+    os.fsync(fileobj.fileno())
+
+
+def fsync_directory(path):
+    """Wait until the directory entries are in the disk."""
+
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def replace_file(path, sync=SYNC_NONE):
+    """Context manager to rewrite a file. Yields a temporary file, created in
+    the same directory as ``path``, which replaces ``path`` (with
+    :py:func:`os.replace`) when the block finishes. If the block raises an
+    exception the temporary file is removed and ``path`` is not modified.
+
+    :param path: File to replace.
+    :param sync: Durability policy, see
+        :py:data:`pytag.constants.SYNC_NONE`.
+    """
+
+    directory, name = os.path.split(os.path.abspath(path))
+    output_file = tempfile.NamedTemporaryFile('wb', dir=directory,
+                                              prefix='.{}.'.format(name),
+                                              suffix='.tmp', delete=False)
+    try:
+        with output_file:
+            yield output_file
+            if sync >= SYNC_FILE:
+                fsync(output_file)
+        shutil.copymode(path, output_file.name)
+        os.replace(output_file.name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(output_file.name)
+        raise
+
+    if sync >= SYNC_DIRECTORY:
+        fsync_directory(directory)
+
+
 def crc32(*args):
+    """Ogg CRC of all the arguments, as a tuple of 4 bytes (little endian).
+    See :py:class:`pytag.crc.OggCRC`.
+    """
 
-    crc_reg = 0
+    crc = OggCRC()
     for element in args:
-        for i, value in enumerate(element):
-            crc_reg = ((crc_reg << 8) ^ CRC_LOOKUP[((crc_reg >> 24) & 0xff) ^
-                                                   element[i]]) & 0xFFFFFFFF
-
-    a = (crc_reg & 0xff)
-    b = ((crc_reg >> 8) & 0xff)
-    c = ((crc_reg >> 16) & 0xff)
-    d = ((crc_reg >> 24) & 0xff)
+        crc.update(element)
 
-    return a, b, c, d
+    return tuple(crc.digest())
 
 
 def decode_bitwise_int(tup):
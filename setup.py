@@ -16,7 +16,8 @@ setup(name='pytag',
       license='GNU General Public License v3 (GPLv3)',
       url='http://jlesquembre.github.io/pytag/',
       packages=['pytag'],
-      install_requires=['filemagic'],
+      install_requires=[],
+      extras_require={'magic': ['filemagic']},
       classifiers=[
         'Development Status :: 3 - Alpha',
         'Topic :: Multimedia :: Sound/Audio',
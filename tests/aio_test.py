@@ -0,0 +1,125 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytag
+from pytag import aio, Audio
+
+
+class AsyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.ogg = os.path.join(os.path.dirname(__file__), 'files',
+                                'oggvorbis', 'sample.ogg')
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_aread(self):
+        tags = self.run_async(pytag.aread(self.ogg))
+        self.assertEqual(tags['title'], 'test')
+
+        tags = self.run_async(pytag.aread(self.ogg, fields=('artist', )))
+        self.assertEqual(tags, {'artist': 'test'})
+
+        self.assertRaises(pytag.FormatNotSupportedError, self.run_async,
+                          pytag.aread(__file__))
+
+    def test_awrite_tags(self):
+        temp = tempfile.mkstemp()[1]
+        self.addCleanup(os.remove, temp)
+        shutil.copy(self.ogg, temp)
+
+        audio = Audio(temp)
+        self.run_async(audio.awrite_tags({'title': 'new'}))
+        self.assertEqual(self.run_async(audio.aget_tags()), {'title': 'new'})
+
+    def test_limit(self):
+        lock = threading.Lock()
+        running = []
+        counts = []
+
+        def work():
+            with lock:
+                running.append(1)
+                counts.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        executor = ThreadPoolExecutor(8)
+        self.addCleanup(executor.shutdown)
+        runner = aio.AsyncRunner(executor, limit=2)
+
+        async def main():
+            await asyncio.gather(*[runner.run(work) for i in range(10)])
+
+        self.run_async(main())
+        self.assertEqual(len(counts), 10)
+        self.assertLessEqual(max(counts), 2)
+
+    def test_loop_not_blocked(self):
+        event = threading.Event()
+        runner = aio.AsyncRunner(limit=1)
+
+        async def main():
+            task = asyncio.ensure_future(runner.run(event.wait))
+            ticks = 0
+            while ticks < 5:
+                await asyncio.sleep(0.001)
+                ticks += 1
+            event.set()
+            return await task
+
+        self.assertTrue(self.run_async(main()))
+
+    def test_cancel(self):
+        event = threading.Event()
+        finished = []
+        runner = aio.AsyncRunner(limit=1)
+
+        def first():
+            event.wait()
+            finished.append('first')
+
+        def second():
+            finished.append('second')
+
+        async def main():
+            task = asyncio.ensure_future(runner.run(first))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.sleep(0.01)
+
+            # The first function is still running, so the second waits
+            second_task = asyncio.ensure_future(runner.run(second))
+            await asyncio.sleep(0.01)
+            self.assertEqual(finished, [])
+
+            event.set()
+            await second_task
+            self.assertTrue(task.cancelled())
+
+        self.run_async(main())
+        self.assertEqual(finished, ['first', 'second'])
+
+    def test_configure(self):
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        old = aio.default_runner
+        self.addCleanup(setattr, aio, 'default_runner', old)
+
+        aio.configure(executor, limit=3)
+        self.assertIs(aio.default_runner.executor, executor)
+        self.assertEqual(aio.default_runner.limit, 3)
+        tags = self.run_async(pytag.aread(self.ogg))
+        self.assertEqual(tags['title'], 'test')
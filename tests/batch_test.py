@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import pytag
+from pytag import batch, read_many, scan, FormatNotSupportedError
+
+
+class ReadManyTest(unittest.TestCase):
+
+    def setUp(self):
+        files = os.path.join(os.path.dirname(__file__), 'files')
+        self.ogg = os.path.join(files, 'oggvorbis', 'sample.ogg')
+        self.mp3 = os.path.join(files, 'mp3', 'id3v24.mp3')
+        self.missing = os.path.join(files, 'missing.mp3')
+        self.unknown = __file__
+
+    def test_ordered(self):
+        paths = [self.ogg, self.missing, self.mp3, self.unknown] * 10
+        results = list(read_many(paths, workers=3, max_pending=4))
+
+        self.assertEqual([result.path for result in results], paths)
+        for result in results[::4]:
+            self.assertEqual(result.tags['title'], 'test')
+            self.assertIsNone(result.error)
+        for result in results[1::4]:
+            self.assertIsNone(result.tags)
+            self.assertIsInstance(result.error, FileNotFoundError)
+        for result in results[2::4]:
+            self.assertEqual(result.tags['title'], 'Track Name')
+        for result in results[3::4]:
+            self.assertIsInstance(result.error, FormatNotSupportedError)
+
+    def test_unordered(self):
+        paths = [self.ogg, self.missing, self.mp3] * 10
+        results = list(read_many(paths, workers=3, ordered=False,
+                                 fields=('title', )))
+
+        self.assertEqual(sorted(result.path for result in results),
+                         sorted(paths))
+        for result in results:
+            if result.path == self.ogg:
+                self.assertEqual(result.tags, {'title': 'test'})
+
+    def test_backpressure(self):
+        for ordered in (True, False):
+            consumed = []
+
+            def paths():
+                for i in range(1000):
+                    consumed.append(i)
+                    yield self.ogg
+
+            results = read_many(paths(), workers=2, ordered=ordered,
+                                max_pending=5)
+            next(results)
+            self.assertLessEqual(len(consumed), 5)
+            results.close()
+
+    def test_close_cancels(self):
+        started = []
+        running = threading.Event()
+        event = threading.Event()
+
+        def read(path, fields, cache=None):
+            started.append(path)
+            if path != 'a':
+                running.set()
+                event.wait()
+            return batch.ReadResult(path, {}, None)
+
+        with mock.patch.object(batch, '_read', side_effect=read):
+            results = read_many(['a', 'b', 'c', 'd'], workers=1,
+                                max_pending=3)
+            self.assertEqual(next(results).path, 'a')
+            # "b" is running, "c" is cancelled and "d" never submitted
+            self.assertTrue(running.wait(5))
+            timer = threading.Timer(0.1, event.set)
+            timer.start()
+            results.close()
+            timer.join()
+
+        self.assertEqual(started, ['a', 'b'])
+
+    def test_exported(self):
+        self.assertIs(pytag.ReadResult, batch.ReadResult)
+
+
+class ScanTest(unittest.TestCase):
+
+    def setUp(self):
+        files = os.path.join(os.path.dirname(__file__), 'files')
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+        os.makedirs(os.path.join(self.root, 'a', 'b'))
+        os.makedirs(os.path.join(self.root, 'c'))
+        self.ogg = self._copy(os.path.join(files, 'oggvorbis', 'sample.ogg'),
+                              'a', 'sample.ogg')
+        self.mp3 = self._copy(os.path.join(files, 'mp3', 'id3v24.mp3'),
+                              'a', 'b', 'track.MP3')
+        self.noext = self._copy(self.ogg, 'c', 'sample')
+        self._copy(__file__, 'c', 'fake.mp3')
+        self._copy(__file__, 'c', 'notes.txt')
+        os.link(self.mp3, os.path.join(self.root, 'c', 'link.mp3'))
+
+    def _copy(self, source, *parts):
+        path = os.path.join(self.root, *parts)
+        shutil.copy(source, path)
+        return path
+
+    def _scan(self, **kwargs):
+        return {os.path.relpath(result.path, self.root): result.tags
+                for result in scan(self.root, **kwargs)}
+
+    def test_scan(self):
+        results = self._scan()
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[os.path.join('a', 'sample.ogg')]['title'],
+                         'test')
+        # The file has two hard links, only one is read
+        mp3 = {os.path.join('a', 'b', 'track.MP3'),
+               os.path.join('c', 'link.mp3')}
+        self.assertEqual(len(mp3 & set(results)), 1)
+
+    def test_scan_all_files(self):
+        results = self._scan(extensions=None, fields=('title', ))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[os.path.join('c', 'sample')],
+                         {'title': 'test'})
+
+    def test_parallel_walk(self):
+        self.assertEqual(set(batch.iter_files(self.root, walkers=4)),
+                         set(batch.iter_files(self.root)))
+        self.assertEqual(len(self._scan(walkers=3)), 2)
+
+    def test_symlink_loop(self):
+        os.symlink(self.root, os.path.join(self.root, 'a', 'b', 'loop'))
+
+        self.assertEqual(len(self._scan()), 2)
+        paths = list(batch.iter_files(self.root, follow_symlinks=True))
+        self.assertEqual(len(paths), 3)
+
+    def test_errors(self):
+        with mock.patch.object(batch.AudioReader, 'get_tags',
+                               side_effect=ValueError('broken')):
+            results = list(scan(self.root))
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertIsNone(result.tags)
+            self.assertIsInstance(result.error, ValueError)
+
+    def test_missing_root(self):
+        missing = os.path.join(self.root, 'missing')
+        self.assertEqual(list(scan(missing)), [])
+        self.assertEqual(list(scan(missing, follow_symlinks=True)), [])
+        self.assertEqual(
+            list(batch.iter_files(missing, follow_symlinks=True)), [])
@@ -0,0 +1,120 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pytag import Audio, AudioReader, read_many
+from pytag.cache import TagCache
+
+
+class TagCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.db = os.path.join(self.folder, 'tags.db')
+
+        self.ogg = os.path.join(self.folder, 'sample.ogg')
+        shutil.copy(os.path.join(os.path.dirname(__file__), 'files',
+                                 'oggvorbis', 'sample.ogg'), self.ogg)
+        self._make_old(self.ogg)
+
+        self.tags = {'title': 'test', 'artist': 'test', 'album': 'test',
+                     'genre': 'test'}
+
+    def _make_old(self, path):
+        old = time.time() - 60
+        os.utime(path, (old, old))
+
+    def test_put_get(self):
+        with TagCache(self.db) as cache:
+            self.assertIsNone(cache.get(self.ogg))
+            cache.put(self.ogg, {'title': 'a', 'tracknumber': 1,
+                                 'genre': ['Rock', 'Pop']})
+            self.assertEqual(cache.get(self.ogg),
+                             {'title': 'a', 'tracknumber': 1,
+                              'genre': ['Rock', 'Pop']})
+
+        # Saved in the database
+        with TagCache(self.db) as cache:
+            self.assertEqual(cache.get(self.ogg)['title'], 'a')
+
+        connection = sqlite3.connect(self.db)
+        self.addCleanup(connection.close)
+        (mode, ) = connection.execute('PRAGMA journal_mode').fetchone()
+        self.assertEqual(mode, 'wal')
+
+    def test_changed_file(self):
+        with TagCache(self.db) as cache:
+            cache.put(self.ogg, self.tags)
+            with open(self.ogg, 'ab') as f:
+                f.write(b'\x00')
+            self._make_old(self.ogg)
+            self.assertIsNone(cache.get(self.ogg))
+
+    def test_racy_file(self):
+        with TagCache(self.db) as cache:
+            os.utime(self.ogg)
+            cache.put(self.ogg, self.tags)
+            self.assertIsNone(cache.get(self.ogg))
+
+    def test_batch(self):
+        paths = []
+        for i in range(5):
+            path = os.path.join(self.folder, '{}.ogg'.format(i))
+            shutil.copy(self.ogg, path)
+            self._make_old(path)
+            paths.append(path)
+
+        cache = TagCache(self.db, batch_size=2)
+        self.addCleanup(cache.close)
+        with mock.patch.object(cache, 'flush',
+                               wraps=cache.flush) as flush:
+            for path in paths:
+                cache.put(path, self.tags)
+        self.assertEqual(flush.call_count, 2)
+        self.assertEqual(len(cache._pending), 1)
+        for path in paths:
+            self.assertEqual(cache.get(path), self.tags)
+
+    def test_audio_reader(self):
+        with TagCache(self.db) as cache:
+            self.assertEqual(AudioReader(self.ogg, cache=cache).get_tags(),
+                             self.tags)
+
+            audio = AudioReader(self.ogg, cache=cache)
+            with mock.patch.object(audio._format, 'get_tags') as get_tags:
+                self.assertEqual(audio.get_tags(), self.tags)
+                self.assertEqual(audio.get_tags(fields=('ARTIST', )),
+                                 {'artist': 'test'})
+                self.assertEqual(audio.title, 'test')
+            self.assertFalse(get_tags.called)
+
+    def test_write_tags_invalidates(self):
+        with TagCache(self.db) as cache:
+            audio = Audio(self.ogg, cache=cache)
+            audio.get_tags()
+            self.assertIsNotNone(cache.get(self.ogg))
+
+            audio.write_tags({'title': 'new'})
+            self.assertIsNone(cache.get(self.ogg))
+            self.assertEqual(audio.get_tags(), {'title': 'new'})
+
+    def test_read_many(self):
+        paths = []
+        for i in range(20):
+            path = os.path.join(self.folder, '{}.ogg'.format(i))
+            shutil.copy(self.ogg, path)
+            self._make_old(path)
+            paths.append(path)
+
+        with TagCache(self.db, batch_size=8) as cache:
+            for result in read_many(paths, workers=4, cache=cache):
+                self.assertEqual(result.tags, self.tags)
+
+        with TagCache(self.db) as cache:
+            for path in paths:
+                self.assertEqual(cache.get(path), self.tags)
@@ -0,0 +1,68 @@
+import os
+import unittest
+from array import array
+
+from pytag import utils
+from pytag.crc import OggCRC
+from pytag.constants import CRC_LOOKUP
+from pytag.containers import OggPage
+
+
+def reference_crc(data):
+    """Byte by byte implementation from the Ogg specification."""
+
+    crc_reg = 0
+    for value in data:
+        crc_reg = ((crc_reg << 8) ^
+                   CRC_LOOKUP[((crc_reg >> 24) & 0xff) ^ value]) & 0xFFFFFFFF
+    return crc_reg
+
+
+class OggCRCTest(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertEqual(OggCRC().value, 0)
+        self.assertEqual(OggCRC().digest(), b'\x00' * 4)
+
+    def test_reference(self):
+        data = bytes(range(256)) * 7 + b'pytag'
+        self.assertEqual(OggCRC(data).value, reference_crc(data))
+
+    def test_incremental(self):
+        data = os.urandom(4099)
+        crc = OggCRC()
+        for i in range(0, len(data), 100):
+            crc.update(data[i:i+100])
+        self.assertEqual(crc.value, reference_crc(data))
+        self.assertEqual(crc.digest(), OggCRC(data).digest())
+
+    def test_copy(self):
+        crc = OggCRC(b'py')
+        other = crc.copy().update(b'tag')
+        self.assertEqual(crc.value, reference_crc(b'py'))
+        self.assertEqual(other.value, reference_crc(b'pytag'))
+
+    def test_buffer_types(self):
+        data = b'pytag' * 10
+        expected = OggCRC(data).digest()
+        self.assertEqual(OggCRC(bytearray(data)).digest(), expected)
+        self.assertEqual(OggCRC(memoryview(data)).digest(), expected)
+        self.assertEqual(OggCRC(array('B', data)).digest(), expected)
+
+    def test_utils_crc32(self):
+        data = b'pytag'
+        self.assertEqual(utils.crc32(data[:2], data[2:]),
+                         tuple(OggCRC(data).digest()))
+
+    def test_ogg_page(self):
+        path = os.path.join(os.path.dirname(__file__), 'files', 'oggvorbis',
+                            'sample.ogg')
+        with open(path, 'rb') as f:
+            page = OggPage(f)
+            while True:
+                crc = page.crc
+                self.assertEqual(page.as_bytes(update_crc=True)[22:26],
+                                 array('B', crc.to_bytes(4, 'little')))
+                if page.is_last_page():
+                    break
+                page.next_page()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from pytag import detection, AudioReader
+from pytag.containers import OggPage
+
+
+class DetectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.files = os.path.join(os.path.dirname(__file__), 'files')
+
+    def _path(self, *parts):
+        return os.path.join(self.files, *parts)
+
+    def test_detect_files(self):
+        expected = {('oggvorbis', 'sample.ogg'): 'audio/ogg',
+                    ('oggvorbis', 'nocomments.ogg'): 'audio/ogg',
+                    ('opus', 'example.opus'): 'audio/opus',
+                    ('mp3', 'id3v1.mp3'): 'audio/mpeg',
+                    ('mp3', 'id3v24.mp3'): 'audio/mpeg'}
+
+        for parts, mimetype in expected.items():
+            self.assertEqual(detection.detect_file(self._path(*parts)),
+                             mimetype)
+
+    def test_detect(self):
+        self.assertEqual(detection.detect(b'ID3\x04\x00'), 'audio/mpeg')
+        self.assertEqual(detection.detect(b'\xff\xfb\x90\x64'), 'audio/mpeg')
+        self.assertIsNone(detection.detect(b''))
+        self.assertIsNone(detection.detect(b'\xff\xf1\x50\x80'))  # AAC
+        self.assertIsNone(detection.detect(b'OggS' + bytes(23)))
+        self.assertIsNone(detection.detect(b'fLaC\x00\x00\x00\x22'))
+
+    def test_detect_multiplexed(self):
+        # Layout of formats_test.OggDemuxTest: a Skeleton stream first
+        fishead = bytearray(OggPage.header_struct.pack(
+            b'OggS', 0, 2, 0, 1234, 0, 0, 1))
+        fishead += bytes([8]) + b'fishead\x00'
+
+        with open(self._path('oggvorbis', 'sample.ogg'), 'rb') as f:
+            sample = f.read()
+        self.assertEqual(detection.detect(bytes(fishead) + sample),
+                         'audio/ogg')
+        self.assertIsNone(detection.detect(bytes(fishead) * 2))
+
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(fishead + sample)
+        self.addCleanup(os.remove, path)
+        self.assertEqual(AudioReader(path).title, 'test')
+
+        # Only the beginning of stream pages at the start are checked
+        foreign = bytearray(fishead)
+        foreign[5] = 0
+        self.assertIsNone(detection.detect(bytes(fishead + foreign) +
+                                           sample))
+
+    def _unknown_file(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'Some text\n')
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_magic_not_used(self):
+        with mock.patch.object(detection, 'magic_pool') as pool:
+            detection.detect_file(self._path('mp3', 'id3v1.mp3'))
+        self.assertFalse(pool.handle.called)
+
+    def test_unknown(self):
+        path = self._unknown_file()
+
+        with mock.patch.object(detection, 'magic_pool', None):
+            self.assertEqual(detection.detect_file(path),
+                             'application/octet-stream')
+
+    @unittest.skipIf(detection.magic is None, 'filemagic not installed')
+    def test_magic_pool(self):
+        path = self._unknown_file()
+        pool = detection.MagicPool(detection.magic.MAGIC_MIME_TYPE)
+
+        with mock.patch.object(detection, 'magic_pool', pool):
+            self.assertEqual(detection.detect_file(path), 'text/plain')
+            self.assertEqual(detection.detect_file(path), 'text/plain')
+        self.assertEqual(len(pool._handles), 1)
+
+        # Threads get different handles
+        with pool.handle() as first, pool.handle() as second:
+            self.assertIsNot(first, second)
+        self.assertEqual(len(pool._handles), 2)
+
+        pool.close()
+        self.assertEqual(pool._handles, [])
+
+    @unittest.skipIf(detection.magic is None, 'filemagic not installed')
+    def test_magic_pool_threads(self):
+        paths = [self._unknown_file() for i in range(4)]
+        pool = detection.MagicPool(detection.magic.MAGIC_MIME_TYPE)
+        results = []
+
+        def run():
+            for i in range(20):
+                results.extend(detection.detect_file(path) for path in paths)
+
+        with mock.patch.object(detection, 'magic_pool', pool):
+            threads = [threading.Thread(target=run) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results, ['text/plain'] * 320)
+        self.assertLessEqual(len(pool._handles), 4)
+        pool.close()
+
+    def test_audio_reader_opus(self):
+        audio = AudioReader(self._path('opus', 'example.opus'))
+        self.assertEqual(audio.mimetype, 'audio/opus')
+        self.assertEqual(audio.get_tags(), {})
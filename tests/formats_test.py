@@ -1,15 +1,19 @@
 import unittest
 import itertools
+import io
 #import subprocess
 import os
 import string
 import shutil
 import tempfile
+import tracemalloc
 
 from nose.tools import *
 
-from pytag.containers import OggPage
-from pytag.formats import OggVorbis, OggVorbisReader, OggOpus
+from pytag.containers import OggPage, OggPageView, iter_pages
+from pytag.formats import OggVorbis, OggVorbisReader, OggOpus, OggOpusReader
+from pytag.structures import Padding
+from pytag.crc import OggCRC
 
 oggs = (
     {'name': 'nocomments.ogg',
@@ -151,3 +155,343 @@ class OggVorbisWriteTest(unittest.TestCase):
             self.assertFalse(ogg_new.is_last_page())
             ogg_new.next_page()
             self.assertTrue(ogg_new.is_last_page())
+
+    def test_write_in_place(self):
+        ogg = OggVorbis(self.temp_ogg)
+        self.tags = {'title': 'in place'}
+        inode = os.stat(self.temp_ogg).st_ino
+
+        ogg.write_tags(self.tags)
+        self.assert_new_tags()
+
+        self.assertEqual(inode, os.stat(self.temp_ogg).st_ino)
+        self.assertEqual(os.path.getsize(self.ogg_path),
+                         os.path.getsize(self.temp_ogg))
+
+        # Padding from the first write is reused
+        self.tags = {'title': 'in place again', 'artist': 'pytag'}
+        ogg.write_tags(self.tags)
+        self.assert_new_tags()
+        self.assertEqual(inode, os.stat(self.temp_ogg).st_ino)
+
+    def test_write_same_page_count(self):
+        """Comments don't fit in place, but the audio pages can be copied
+        without changes.
+        """
+
+        ogg = OggVorbis(self.temp_ogg)
+        self.tags = {'title': 'a' * 5000}
+
+        ogg.write_tags(self.tags)
+        self.assert_new_tags()
+
+        with open(self.ogg_path, 'rb') as old,\
+                open(self.temp_ogg, 'rb') as new:
+            ogg_old = OggPage(old)
+            ogg_new = OggPage(new)
+            ogg_old.next_page().next_page()
+            ogg_new.next_page().next_page()
+            self.assertEqual(ogg_old.number, ogg_new.number)
+            self.assertEqual(old.read(), new.read())
+
+    def test_padding(self):
+        ogg = OggVorbis(self.temp_ogg)
+        ogg.get_tags()
+        self.assertEqual(ogg.padding_size, 0)
+
+        ogg.padding = Padding(2000)
+        ogg.write_tags({'title': 'a' * 5000})
+        ogg.get_tags()
+        self.assertEqual(ogg.padding_size, 2000)
+
+        # Next changes are written in place, using the padding
+        inode = os.stat(self.temp_ogg).st_ino
+        self.tags = {'title': 'a' * 5000, 'artist': 'b' * 1000}
+        ogg.write_tags(self.tags)
+        self.assert_new_tags()
+        self.assertEqual(inode, os.stat(self.temp_ogg).st_ino)
+
+        ogg.get_tags()
+        self.assertTrue(0 < ogg.padding_size < 1000)
+
+    def test_padding_percent(self):
+        ogg = OggVorbis(self.temp_ogg)
+        ogg.padding = Padding(percent=50)
+        tags = {'title': 'a' * 5000}
+        size = len(ogg.generate_comments(tags).getvalue())
+
+        ogg.write_tags(tags)
+        ogg.get_tags()
+        self.assertEqual(ogg.padding_size, size // 2)
+
+    def test_write_bounded_memory(self):
+        with open(self.temp_ogg, 'ab') as f:
+            for i in range(32):
+                f.write(bytes(256 * 1024))   # 8 MiB after the last page
+        size = os.path.getsize(self.temp_ogg)
+
+        ogg = OggVorbis(self.temp_ogg)
+        ogg.buffer_size = 16 * 1024
+        self.tags = {'title': 'a' * 5000}
+
+        tracemalloc.start()
+        try:
+            ogg.write_tags(self.tags)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 1024 * 1024)
+        self.assertEqual(OggVorbisReader(self.temp_ogg).get_tags(), self.tags)
+        self.assertGreater(os.path.getsize(self.temp_ogg), size)
+
+    def test_value_with_equals_sign(self):
+        ogg = OggVorbis(self.temp_ogg)
+        self.tags = {'title': 'a=b'}
+
+        ogg.write_tags(self.tags)
+        self.assert_new_tags()
+
+    def test_read_fields(self):
+        ogg = OggVorbis(self.temp_ogg)
+        ogg.write_tags({'title': 'a=b', 'artist': 'first', 'Album': 'album',
+                        'genre': 'x' * 1000})
+
+        self.assertEqual(ogg.get_tags(fields=('ALBUM', 'title')),
+                         {'album': 'album', 'title': 'a=b'})
+        self.assertEqual(ogg.get_tags(fields=('tracknumber', )), {})
+        self.assertEqual(ogg.get_tags(fields=()), {})
+
+    def test_process_comments_fields(self):
+        vorbis = OggVorbis(self.temp_ogg)
+        packet = vorbis.generate_comments({'title': 'title',
+                                           'artist': 'artist',
+                                           'artistic': 'no'}).getvalue()
+
+        # Stops when the fields are found, broken comments are not read
+        comments = vorbis.process_comments(packet[:-20], fields=('title', ))
+        self.assertEqual(comments, {'title': 'title'})
+
+        comments = vorbis.process_comments(packet, fields=('artist', ))
+        self.assertEqual(comments, {'artist': 'artist'})
+
+    def test_process_comments_repeated(self):
+        vorbis = OggVorbis(self.temp_ogg)
+        packet = bytearray(vorbis.signature)
+        packet += (0).to_bytes(4, 'little') + (3).to_bytes(4, 'little')
+        for comment in (b'ARTIST=first', b'title=title', b'artist=second'):
+            packet += len(comment).to_bytes(4, 'little') + comment
+        packet.append(1)
+
+        # The first value, with or without fields
+        self.assertEqual(vorbis.process_comments(packet),
+                         {'artist': 'first', 'title': 'title'})
+        self.assertEqual(vorbis.process_comments(packet, fields=('artist', )),
+                         {'artist': 'first'})
+
+
+class OggPageViewTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ogg_path = os.path.join(os.path.dirname(__file__), 'files',
+                                     'oggvorbis', 'sample.ogg')
+
+    def test_iter_pages(self):
+        with open(self.ogg_path, 'rb') as f:
+            data = f.read()
+
+        f = io.BytesIO(data)
+        page = OggPage(f)
+        views = list(iter_pages(data))
+        for view in views:
+            self.assertEqual(view.number, page.number)
+            self.assertEqual(view.granule_position, page.granule_position)
+            self.assertEqual(view.crc, page.crc)
+            self.assertEqual(view.segment_table, page.segment_table)
+            self.assertEqual(view.data, page.as_bytes())
+            self.assertTrue(view.check_crc())
+            if not page.is_last_page():
+                page.next_page()
+
+        self.assertTrue(views[-1].is_last_page())
+        self.assertEqual(views[-1].offset + views[-1].size, len(data))
+
+    def test_iter_pages_stops_at_garbage(self):
+        with open(self.ogg_path, 'rb') as f:
+            data = f.read()
+
+        pages = list(iter_pages(data + b'garbage'))
+        self.assertEqual(pages[-1].offset + pages[-1].size, len(data))
+
+    def test_renumbered(self):
+        with open(self.ogg_path, 'rb') as f:
+            view = list(iter_pages(f.read()))[3]
+
+        page = OggPageView(view.renumbered(30))
+        self.assertEqual(page.number, 30)
+        self.assertTrue(page.check_crc())
+        self.assertEqual(page.payload, view.payload)
+
+    def test_verify(self):
+        self.assertTrue(OggVorbisReader(self.ogg_path).verify())
+
+        temp = tempfile.mkstemp()[1]
+        shutil.copy(self.ogg_path, temp)
+        with open(temp, 'r+b') as f:
+            f.seek(-1, io.SEEK_END)
+            f.write(b'\xff')
+        self.assertFalse(OggVorbisReader(temp).verify())
+        os.remove(temp)
+
+    def _broken_copy(self, change):
+        fd, temp = tempfile.mkstemp()
+        self.addCleanup(os.remove, temp)
+        with open(self.ogg_path, 'rb') as f:
+            data = bytearray(f.read())
+        with os.fdopen(fd, 'wb') as f:
+            f.write(change(data))
+        return OggVorbisReader(temp)
+
+    def test_verify_capture_pattern(self):
+        offset = list(iter_pages(self._ogg_data()))[3].offset
+
+        def change(data):
+            data[offset:offset + 4] = b'XXXX'
+            return data
+
+        self.assertFalse(self._broken_copy(change).verify())
+
+    def test_verify_truncated(self):
+        self.assertFalse(self._broken_copy(lambda data: data[:-100]).verify())
+
+    def test_verify_empty(self):
+        self.assertFalse(self._broken_copy(lambda data: b'').verify())
+
+    def _ogg_data(self):
+        with open(self.ogg_path, 'rb') as f:
+            return f.read()
+
+    def test_duration(self):
+        self.assertAlmostEqual(OggVorbisReader(self.ogg_path).get_duration(),
+                               726552 / 44100)
+
+        opus_path = os.path.join(os.path.dirname(__file__), 'files', 'opus',
+                                 'example.opus')
+        self.assertAlmostEqual(OggOpusReader(opus_path).get_duration(),
+                               11.3547, places=4)
+
+
+class OggDemuxTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = os.path.join(os.path.dirname(__file__), 'files', 'oggvorbis')
+        with open(os.path.join(folder, 'sample.ogg'), 'rb') as f:
+            self.sample = f.read()
+        with open(os.path.join(folder, 'nocomments.ogg'), 'rb') as f:
+            self.nocomments = f.read()
+        self.temp = tempfile.mkstemp()[1]
+
+    def tearDown(self):
+        os.remove(self.temp)
+
+    def foreign_page(self, header_type, number, payload):
+        page = bytearray(OggPage.header_struct.pack(
+            b'OggS', 0, header_type, 0, 1234, number, 0, 1))
+        page.append(len(payload))
+        page.extend(payload)
+        page[22:26] = OggCRC(page).digest()
+        return page
+
+    def read(self, *chunks):
+        with open(self.temp, 'wb') as f:
+            f.writelines(chunks)
+        return OggVorbisReader(self.temp)
+
+    def test_multiplexed(self):
+        pages = [view.data for view in iter_pages(self.sample)]
+        reader = self.read(self.foreign_page(2, 0, b'fishead\x00'),
+                           pages[0],
+                           self.foreign_page(0, 1, b'foreign'),
+                           *pages[1:] + [self.foreign_page(4, 2, b'eos')])
+        self.assertEqual(reader.get_tags(), {'title': 'test',
+                                             'artist': 'test',
+                                             'album': 'test',
+                                             'comment': 'test',
+                                             'genre': 'test'})
+        self.assertTrue(reader.verify())
+
+    def test_chained(self):
+        reader = self.read(self.sample, self.nocomments)
+        self.assertEqual(reader.get_chained_tags(), [{'title': 'test',
+                                                      'artist': 'test',
+                                                      'album': 'test',
+                                                      'comment': 'test',
+                                                      'genre': 'test'},
+                                                     {}])
+        self.assertEqual(reader.get_tags(), reader.get_chained_tags()[0])
+
+    def test_no_stream(self):
+        reader = self.read(self.foreign_page(2, 0, b'fishead\x00'))
+        self.assertRaises(ValueError, reader.get_tags)
+        self.assertEqual(reader.get_chained_tags(), [])
+
+    def foreign_payloads(self):
+        with open(self.temp, 'rb') as f:
+            return [view.payload.tobytes() for view in iter_pages(f.read())
+                    if view.serial == 1234]
+
+    def test_write_multiplexed(self):
+        pages = [view.data for view in iter_pages(self.sample)]
+        self.read(self.foreign_page(2, 0, b'fishead\x00'),
+                  pages[0],
+                  self.foreign_page(0, 1, b'foreign'),
+                  *pages[1:] + [self.foreign_page(4, 2, b'eos')])
+        foreign = self.foreign_payloads()
+
+        ogg = OggVorbis(self.temp)
+        ogg.write_tags({'title': 'new'})
+        self.assertEqual(ogg.get_tags(), {'title': 'new'})
+        self.assertTrue(ogg.verify())
+        self.assertEqual(self.foreign_payloads(), foreign)
+
+        # Rewrite, with more header pages
+        ogg.write_tags({'title': 'x' * 10000})
+        self.assertEqual(ogg.get_tags(), {'title': 'x' * 10000})
+        self.assertTrue(ogg.verify())
+        self.assertEqual(self.foreign_payloads(), foreign)
+
+    def test_write_interleaved(self):
+        with open(self.temp, 'wb') as f:
+            f.write(self.sample)
+        OggVorbis(self.temp).write_tags({'title': 'x' * 10000})
+        with open(self.temp, 'rb') as f:
+            pages = [view.data.tobytes() for view in iter_pages(f.read())]
+
+        # A page of other stream between the header pages
+        self.read(self.foreign_page(2, 0, b'fishead\x00'),
+                  pages[0], pages[1],
+                  self.foreign_page(0, 1, b'foreign'),
+                  *pages[2:] + [self.foreign_page(4, 2, b'eos')])
+
+        ogg = OggVorbis(self.temp)
+        ogg.write_tags({'title': 'new'})
+        self.assertEqual(ogg.get_tags(), {'title': 'new'})
+        self.assertTrue(ogg.verify())
+        self.assertEqual(self.foreign_payloads(),
+                         [b'fishead\x00', b'foreign', b'eos'])
+
+    def test_write_no_comments(self):
+        pages = [view.data for view in iter_pages(self.sample)]
+        self.read(self.foreign_page(2, 0, b'fishead\x00'), pages[0],
+                  *pages[2:])
+        with open(self.temp, 'rb') as f:
+            data = f.read()
+
+        self.assertRaises(ValueError, OggVorbis(self.temp).write_tags,
+                          {'title': 'new'})
+        with open(self.temp, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+        self.read(self.foreign_page(2, 0, b'fishead\x00'))
+        self.assertRaises(ValueError, OggVorbis(self.temp).write_tags,
+                          {'title': 'new'})
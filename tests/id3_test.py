@@ -1,13 +1,36 @@
 import unittest
 import tempfile
 import shutil
+import io
 import os
+import tracemalloc
+import zlib
+from unittest import mock
 
-from pytag import Audio
+from pytag import Audio, utils
 from pytag.formats import Mp3
+from pytag.codecs import MpegFrame
 from pytag.constants import FIELD_NAMES
 
 
+class CountingReader(io.BufferedReader):
+    """Counts the read and seek calls."""
+
+    def __init__(self, raw):
+        super().__init__(raw.detach())
+        self.reads = self.seeks = self.bytes_read = 0
+
+    def read(self, *args):
+        self.reads += 1
+        data = super().read(*args)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, *args):
+        self.seeks += 1
+        return super().seek(*args)
+
+
 class Mp3Test(unittest.TestCase):
 
     def setUp(self):
@@ -202,3 +225,547 @@ class Mp3Test(unittest.TestCase):
         self.assertEqual(audio.get_tags(), tags)
         audio.write_tags(tags)
         self.assertEqual(audio.get_tags(), tags)
+
+    def test_write_tags_bounded_memory(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v24.mp3')
+        mp3_temp = tempfile.mkstemp()[1]
+        shutil.copy(mp3_path, mp3_temp)
+        with open(mp3_temp, 'ab') as f:
+            for i in range(32):
+                f.write(bytes(256 * 1024))   # 8 MiB of "audio"
+        size = os.path.getsize(mp3_temp)
+
+        id3 = Mp3(mp3_temp)
+        id3.buffer_size = 16 * 1024
+        # Too big for the old tag, the file has to be rewritten
+        tags = {'title': 'Track Name' * 1000}
+
+        tracemalloc.start()
+        try:
+            id3.write_tags(tags)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 1024 * 1024)
+        self.assertEqual(id3.get_tags(), tags)
+        self.assertGreater(os.path.getsize(mp3_temp), size - 1024)
+
+        os.remove(mp3_temp)
+
+    def test_write_tags_in_place(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v24_all_tags.mp3')
+        mp3_temp = tempfile.mkstemp()[1]
+        shutil.copy(mp3_path, mp3_temp)
+        stat = os.stat(mp3_temp)
+
+        id3 = Mp3(mp3_temp)
+        tags = {'title': 'Track Name', 'artist': 'Artist'}
+        id3.write_tags(tags)
+
+        new_stat = os.stat(mp3_temp)
+        self.assertEqual(new_stat.st_ino, stat.st_ino)
+        self.assertEqual(new_stat.st_size, stat.st_size)
+        self.assertEqual(id3.get_tags(), tags)
+
+        os.remove(mp3_temp)
+
+    def test_write_tags_padding(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v1.mp3')
+        mp3_temp = tempfile.mkstemp()[1]
+        shutil.copy(mp3_path, mp3_temp)
+        size = os.path.getsize(mp3_temp)
+
+        id3 = Mp3(mp3_temp)
+        tags = {'title': 'Track Name'}
+        id3.write_tags(tags)
+
+        # New ID3v2 tag with padding, without the ID3v1 tag
+        frames_size = 10 + 1 + len('Track Name')
+        self.assertEqual(os.path.getsize(mp3_temp),
+                         size - 128 + 10 + frames_size + 1024)
+        self.assertEqual(id3.get_tags(), tags)
+
+        # Now the padding is used
+        stat = os.stat(mp3_temp)
+        tags['artist'] = 'Artist'
+        id3.write_tags(tags)
+        self.assertEqual(os.stat(mp3_temp).st_ino, stat.st_ino)
+        self.assertEqual(os.stat(mp3_temp).st_size, stat.st_size)
+        self.assertEqual(id3.get_tags(), tags)
+
+        os.remove(mp3_temp)
+
+    def test_write_tags_in_place_removes_v1(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v24.mp3')
+        mp3_temp = tempfile.mkstemp()[1]
+        shutil.copy(mp3_path, mp3_temp)
+        with open(mp3_path, 'rb') as f:
+            f.seek(-128, os.SEEK_END)
+            has_v1 = f.read(3) == b'TAG'
+        if not has_v1:
+            with open(mp3_temp, 'ab') as f:
+                f.write(b'TAG' + bytes(125))
+        size = os.path.getsize(mp3_temp)
+
+        id3 = Mp3(mp3_temp)
+        tags = {'title': 'Track Name'}
+        id3.write_tags(tags)
+
+        self.assertEqual(os.path.getsize(mp3_temp), size - 128)
+        with open(mp3_temp, 'rb') as f:
+            f.seek(-128, os.SEEK_END)
+            self.assertNotEqual(f.read(3), b'TAG')
+        self.assertEqual(id3.get_tags(), tags)
+
+        os.remove(mp3_temp)
+
+    def _frame_contents(self, id3):
+        contents = []
+        for frame in id3.get_frames():
+            data = io.BytesIO()
+            id3.copy_frame(frame, data)
+            contents.append((frame.id, data.getvalue()))
+        return contents
+
+    def test_merge(self):
+        mp3_path = os.path.join(self.mp3_folder, 'pad.mp3')
+        mp3_temp = tempfile.mkstemp()[1]
+        shutil.copy(mp3_path, mp3_temp)
+
+        id3 = Mp3(mp3_temp)
+        tags = id3.get_tags()
+        frames = self._frame_contents(id3)
+
+        id3.write_tags({'title': 'New title', 'genre': None}, merge=True)
+
+        tags['title'] = 'New title'
+        del tags['genre']
+        self.assertEqual(id3.get_tags(), tags)
+
+        # Unchanged frames (also the not supported ones) are kept
+        expected = [frame for frame in frames
+                    if frame[0] not in (b'TIT2', b'TCON')]
+        self.assertEqual(self._frame_contents(id3)[:-1], expected)
+
+        os.remove(mp3_temp)
+
+    def test_merge_keeps_version(self):
+        for name, version in (('id3v22.mp3', 2), ('id3v23.mp3', 3)):
+            mp3_path = os.path.join(self.mp3_folder, name)
+            mp3_temp = tempfile.mkstemp()[1]
+            shutil.copy(mp3_path, mp3_temp)
+
+            id3 = Mp3(mp3_temp)
+            tags = id3.get_tags()
+            tags.update({'title': 'ァアィイ', 'artist': 'Artist'})
+            id3.write_tags({'title': 'ァアィイ', 'artist': 'Artist'},
+                           merge=True)
+
+            self.assertEqual(id3.get_tags(), tags)
+            with open(mp3_temp, 'rb') as f:
+                self.assertEqual(f.read(4), b'ID3' + bytes([version]))
+
+            os.remove(mp3_temp)
+
+    def test_merge_v1(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v1.mp3')
+        mp3_temp = tempfile.mkstemp()[1]
+        shutil.copy(mp3_path, mp3_temp)
+
+        id3 = Mp3(mp3_temp)
+        tags = {key: str(value) for key, value in id3.get_tags().items()}
+        id3.write_tags({'title': 'New title'}, merge=True)
+
+        tags['title'] = 'New title'
+        self.assertEqual(id3.get_tags(), tags)
+
+        os.remove(mp3_temp)
+
+    def test_as_field(self):
+        self.assertEqual(Mp3.as_field(b'TT2', 2), 'title')
+        self.assertEqual(Mp3.as_field(b'TYER', 3), 'date')
+        self.assertEqual(Mp3.as_field(b'TDRC', 4), 'date')
+        self.assertRaises(ValueError, Mp3.as_field, b'TXXX', 4)
+        self.assertRaises(ValueError, Mp3.as_field, b'TDRC', 3)
+
+    def test_unknown_frames(self):
+        id3 = Mp3(None)
+        self.assertIsNone(id3._read_id3_generic_frame(b'TXXX', b'\x03a', 4))
+        self.assertIsNone(id3._read_id3_generic_frame(b'TIT2', b'', 4))
+        self.assertIsNone(id3._read_id3_generic_frame(b'TIT2', b'\x09a', 4))
+        self.assertEqual(id3._read_id3_generic_frame(b'TCON', b'\x00(0)', 3),
+                         {'genre': 'Blues'})
+
+    def _write_id3(self, mayor, flags, body):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'ID3' + bytes([mayor, 0, flags]))
+            f.write(bytes(utils.encode_bitwise_int(len(body))))
+            f.write(body)
+            f.write(b'\xff\xfb\x90\x00' + bytes(1000))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _frame(self, mayor, frame_id, content, flags=0):
+        if mayor == 3:
+            size = len(content).to_bytes(4, byteorder='big')
+        else:
+            size = bytes(utils.encode_bitwise_int(len(content)))
+        return frame_id + size + flags.to_bytes(2, byteorder='big') + content
+
+    def _unsynchronise(self, data):
+        return data.replace(b'\xff', b'\xff\x00')
+
+    def test_v23_unsynchronisation(self):
+        title = 'ÿÿ title ÿ'
+        body = (self._frame(3, b'TIT2', b'\x01' + title.encode('utf_16')) +
+                self._frame(3, b'TPE1', b'\x00Artist') +
+                self._frame(3, b'PRIV', b'\xff\xe0\xff'))
+        path = self._write_id3(3, 0x80, self._unsynchronise(body))
+
+        id3 = Mp3(path)
+        self.assertEqual(id3.get_tags(), {'title': title, 'artist': 'Artist'})
+
+        priv = io.BytesIO()
+        id3.copy_frame(id3.get_frames()[2], priv)
+        self.assertEqual(priv.getvalue(), b'\xff\xe0\xff')
+
+    def test_extended_header(self):
+        body = (b'\x00\x00\x00\x06' + bytes(6) +
+                self._frame(3, b'TIT2', b'\x00Title'))
+        id3 = Mp3(self._write_id3(3, 0x40, body))
+        self.assertEqual(id3.get_tags(), {'title': 'Title'})
+
+        body = (bytes(utils.encode_bitwise_int(6)) + b'\x01\x00' +
+                self._frame(4, b'TIT2', b'\x03Title'))
+        id3 = Mp3(self._write_id3(4, 0x40, body))
+        self.assertEqual(id3.get_tags(), {'title': 'Title'})
+
+    def test_v24_frame_flags(self):
+        title = 'ÿ title'.encode('utf_16')
+        compressed = zlib.compress(b'\x03Album')
+        body = (
+            # Unsynchronised, with data length indicator
+            self._frame(4, b'TIT2', bytes(utils.encode_bitwise_int(
+                len(title) + 1)) + self._unsynchronise(b'\x01' + title),
+                flags=0x0003) +
+            # Compressed, with data length indicator
+            self._frame(4, b'TALB', b'\x00\x00\x00\x06' + compressed,
+                        flags=0x0009) +
+            # Grouped
+            self._frame(4, b'TPE1', b'\x01\x03Artist', flags=0x0040) +
+            # Encrypted
+            self._frame(4, b'TCON', b'\x80\x03Rock', flags=0x0004))
+
+        id3 = Mp3(self._write_id3(4, 0, body))
+        self.assertEqual(id3.get_tags(), {'title': 'ÿ title',
+                                          'album': 'Album',
+                                          'artist': 'Artist'})
+
+    def test_v24_unsynchronisation(self):
+        title = 'ÿ title'.encode('utf_16')
+        body = self._frame(4, b'TIT2', self._unsynchronise(b'\x01' + title))
+        id3 = Mp3(self._write_id3(4, 0x80, body))
+        self.assertEqual(id3.get_tags(), {'title': 'ÿ title'})
+
+        id3.write_tags({'artist': 'Artist'}, merge=True)
+        self.assertEqual(id3.get_tags(), {'title': 'ÿ title',
+                                          'artist': 'Artist'})
+
+    def test_v23_compressed_frame(self):
+        compressed = zlib.compress(b'\x00Title')
+        body = (self._frame(3, b'TIT2', b'\x00\x00\x00\x06' + compressed,
+                            flags=0x0080) +
+                self._frame(3, b'TPE1', b'\x01\x00Artist', flags=0x0020) +
+                self._frame(3, b'TALB', b'\x80\x00Album', flags=0x0040))
+        id3 = Mp3(self._write_id3(3, 0, body))
+        self.assertEqual(id3.get_tags(), {'title': 'Title',
+                                          'artist': 'Artist'})
+
+    def test_merge_compressed_v22(self):
+        path = self._write_id3(2, 0x40, b'TT2\x00\x00\x06\x00hello')
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        id3 = Mp3(path)
+        self.assertRaises(ValueError, id3.write_tags, {'artist': 'x'},
+                          merge=True)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+        # The old tag can be replaced
+        id3.write_tags({'artist': 'x'})
+        self.assertEqual(id3.get_tags(), {'artist': 'x'})
+
+    def test_merge_unsynchronised(self):
+        title = 'ÿ title'
+        body = (b'\x00\x00\x00\x06' + bytes(6) +
+                self._frame(3, b'TIT2', b'\x01' + title.encode('utf_16')) +
+                self._frame(3, b'PRIV', b'\xff\xe0\xff'))
+        path = self._write_id3(3, 0xC0, self._unsynchronise(body))
+
+        id3 = Mp3(path)
+        id3.write_tags({'artist': 'ÿ Artist'}, merge=True)
+        self.assertEqual(id3.get_tags(), {'title': title,
+                                          'artist': 'ÿ Artist'})
+
+        # Written without extended header and unsynchronisation
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(6), b'ID3\x03\x00\x00')
+        priv = io.BytesIO()
+        id3.copy_frame(id3.get_frames()[1], priv)
+        self.assertEqual(priv.getvalue(), b'\xff\xe0\xff')
+
+    def test_frame_index(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v24_all_tags.mp3')
+
+        id3 = Mp3(mp3_path)
+        id3.get_tags()
+
+        ids = [frame.id for frame in id3.frames]
+        self.assertIn(b'TIT2', ids)
+        with open(mp3_path, 'rb') as f:
+            for frame in id3.frames:
+                f.seek(frame.offset - 10)
+                self.assertEqual(f.read(4), frame.id)
+                if frame.id == b'TIT2':
+                    f.seek(frame.offset)
+                    self.assertEqual(f.read(frame.size), b'\x00title')
+
+    def test_read_fields(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v24_all_tags.mp3')
+
+        id3 = Mp3(mp3_path)
+        all_frames = id3.get_frames()
+
+        self.assertEqual(id3.get_tags(fields=('album', 'title')),
+                         {'album': 'album', 'title': 'title'})
+        # Stops after TALB and TIT2, the second and third frames
+        self.assertEqual(id3.frames, all_frames[:3])
+
+        self.assertEqual(id3.get_tags(fields=('foo', )), {})
+        self.assertEqual(id3.frames, [])
+
+        id3 = Mp3(os.path.join(self.mp3_folder, 'id3v1_g.mp3'))
+        self.assertEqual(id3.get_tags(fields=('genre', 'foo')),
+                         {'genre': 'Rock'})
+        self.assertEqual(id3.get_tags(fields=('GENRE', )),
+                         {'genre': 'Rock'})
+
+        id3 = Mp3(mp3_path)
+        self.assertEqual(id3.get_tags(fields=('Title', )), {'title': 'title'})
+
+    def test_repeated_frames(self):
+        path = self._write_id3(4, 0, b''.join([
+            self._frame(4, b'TIT2', b'\x03first'),
+            self._frame(4, b'TPE1', b'\x03artist'),
+            self._frame(4, b'TIT2', b'\x03second')]))
+
+        # The first value, with or without fields
+        self.assertEqual(Mp3(path).get_tags(),
+                         {'title': 'first', 'artist': 'artist'})
+        self.assertEqual(Mp3(path).get_tags(fields=('title', )),
+                         {'title': 'first'})
+        self.assertEqual(Audio(path).title, 'first')
+
+    def test_single_read(self):
+        mp3_path = os.path.join(self.mp3_folder, 'id3v24_all_tags.mp3')
+
+        id3 = Mp3(mp3_path)
+        with mock.patch('builtins.open', side_effect=lambda *args: (
+                CountingReader(io.open(*args)))):
+            id3.get_tags()
+        self.assertLessEqual(id3.input_file.reads, 3)
+        self.assertEqual(id3.input_file.seeks, 0)
+
+    def _write_tail(self, *tags):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'\xff\xfb\x90\x00' + bytes(10000))
+            for tag in tags:
+                f.write(tag)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _id3v1(self, title, genre=17):
+        return (b'TAG' + title.ljust(30, b'\x00') +
+                b'Artist'.ljust(30, b'\x00') + bytes(30) + b'2011' +
+                bytes(29) + b'\x03' + bytes([genre]))
+
+    def _ape(self, items, header=False):
+        data = b''.join(
+            len(value).to_bytes(4, 'little') + flags.to_bytes(4, 'little') +
+            key + b'\x00' + value for key, value, flags in items)
+        size = (len(data) + 32).to_bytes(4, 'little')
+        fields = (b'\xd0\x07\x00\x00' + size +
+                  len(items).to_bytes(4, 'little'))
+        footer = b'APETAGEX' + fields + b'\x00\x00\x00\x80' + bytes(8)
+        if header:
+            data = (b'APETAGEX' + fields + b'\x00\x00\x00\xe0' + bytes(8) +
+                    data)
+        return data + footer
+
+    def test_tag_plus(self):
+        title = b'T' * 30
+        tag_plus = (b'TAG+' + b'itle end'.ljust(60, b'\x00') + bytes(120) +
+                    b'\x00' + b'Free genre'.ljust(30, b'\x00') + bytes(12))
+        path = self._write_tail(tag_plus, self._id3v1(title))
+
+        id3 = Mp3(path)
+        self.assertEqual(id3.get_tags(), {'title': 'T' * 30 + 'itle end',
+                                          'artist': 'Artist',
+                                          'date': '2011',
+                                          'tracknumber': 3,
+                                          'genre': 'Free genre'})
+
+        # TAG+ is removed with the ID3v1 tag
+        size = os.path.getsize(path)
+        id3.write_tags({'title': 'Title'})
+        self.assertEqual(id3.get_tags(), {'title': 'Title'})
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(3), b'ID3')
+            f.seek(-(size - 128 - 227), os.SEEK_END)
+            self.assertEqual(f.read(4), b'\xff\xfb\x90\x00')
+            self.assertEqual(f.read(), bytes(10000))
+
+    def test_ape(self):
+        items = [(b'Title', b'Title', 0), (b'ARTIST', b'One\x00Two', 0),
+                 (b'Year', b'2012', 0), (b'Track', b'2/10', 0),
+                 (b'Cover Art (Front)', b'\x00\xff', 2),
+                 (b'Genre', b'Rock', 2)]
+        tags = {'title': 'Title', 'artist': ['One', 'Two'], 'date': '2012',
+                'tracknumber': '2/10'}
+
+        for header in (False, True):
+            id3 = Mp3(self._write_tail(self._ape(items, header)))
+            self.assertEqual(id3.get_tags(), tags)
+
+        # Before the ID3v1 tag, APEv2 values have preference
+        id3 = Mp3(self._write_tail(self._ape(items), self._id3v1(b'Old')))
+        self.assertEqual(id3.get_tags(), dict(tags, genre='Rock'))
+
+    def test_merge_ape(self):
+        items = [(b'Title', b'Title', 0), (b'Genre', b'Rock\x00Pop', 0)]
+        id3 = Mp3(self._write_tail(self._ape(items)))
+        id3.write_tags({'artist': 'Artist'}, merge=True)
+
+        self.assertEqual(id3.get_tags(), {'title': 'Title', 'genre': 'Rock',
+                                          'artist': 'Artist'})
+
+    def test_ape_bigger_than_tail(self):
+        items = [(b'Title', b'T' * 10000, 0), (b'Album', b'Album', 0)]
+        id3 = Mp3(self._write_tail(self._ape(items)))
+        self.assertEqual(id3.get_tags(), {'title': 'T' * 10000,
+                                          'album': 'Album'})
+
+    def test_tail_single_read(self):
+        items = [(b'Title', b'Title', 0)]
+        id3 = Mp3(self._write_tail(self._ape(items), self._id3v1(b'Old')))
+        with mock.patch('builtins.open', side_effect=lambda *args: (
+                CountingReader(io.open(*args)))):
+            id3.get_tags()
+        # The ID3v2 identifier, and the tail
+        self.assertEqual(id3.input_file.reads, 2)
+
+    def test_skip_binary_frames(self):
+        mp3_path = os.path.join(self.mp3_folder, 'pad.mp3')
+
+        id3 = Mp3(mp3_path)
+        with mock.patch('builtins.open', side_effect=lambda *args: (
+                CountingReader(io.open(*args)))):
+            tags = id3.get_tags()
+        self.assertEqual(tags['artist'], 'Jake Bugg')
+
+        # The cover art (183081 bytes) is not read
+        apic = [frame for frame in id3.frames if frame.id == b'APIC'][0]
+        self.assertEqual(apic.size, 183081)
+        self.assertLess(id3.input_file.bytes_read, 100 * 1024)
+
+        cover = io.BytesIO()
+        self.assertEqual(id3.copy_frame(apic, cover), apic.size)
+        self.assertTrue(cover.getvalue().startswith(b'\x00image/jpeg'))
+
+    def test_get_frames(self):
+        mp3_path = os.path.join(self.mp3_folder, 'pad.mp3')
+
+        id3 = Mp3(mp3_path)
+        frames = id3.get_frames()
+        self.assertEqual([frame.id for frame in frames],
+                         [b'TPE2', b'TENC', b'APIC', b'TIT2', b'TPE1', b'TALB',
+                          b'TDRC', b'COMM', b'TRCK', b'TCON'])
+        self.assertEqual(Mp3(os.path.join(self.mp3_folder,
+                                          'id3v1.mp3')).get_frames(), [])
+
+
+class MpegInfoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mp3_folder = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), 'files', 'mp3')
+
+    def _write_audio(self, audio, tags=b''):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(audio + tags)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_frame(self):
+        frame = MpegFrame(b'\x00\xff\xfb\x90\x64', 1)
+        self.assertEqual((frame.version, frame.layer, frame.bitrate,
+                          frame.sample_rate, frame.channels, frame.samples,
+                          frame.size), (1, 3, 128000, 44100, 2, 1152, 417))
+
+        # MPEG 2 layer III, 32 kbit/s, 22050 Hz, mono, padding
+        frame = MpegFrame(b'\xff\xf3\x42\xc0')
+        self.assertEqual((frame.version, frame.layer, frame.bitrate,
+                          frame.sample_rate, frame.channels, frame.samples,
+                          frame.size), (2, 3, 32000, 22050, 1, 576, 105))
+
+        for header in (b'\xff\xfb\xf0\x00', b'\xff\xfb\x9c\x00',
+                       b'\xff\xe9\x90\x00', b'\x00\xfb\x90\x00',
+                       b'\xff\xfb'):
+            self.assertRaises(ValueError, MpegFrame, header)
+
+    def test_xing(self):
+        info = Mp3(os.path.join(self.mp3_folder, 'id3v24.mp3')).get_info()
+        self.assertEqual(info.vbr_header, 'Xing')
+        self.assertEqual((info.version, info.layer, info.sample_rate,
+                          info.channels), (1, 3, 44100, 2))
+        self.assertEqual(info.frames, 40)
+        self.assertEqual((info.encoder_delay, info.encoder_padding),
+                         (576, 1404))
+        self.assertAlmostEqual(info.duration, 1.0)
+
+    def test_info(self):
+        mp3 = Mp3(os.path.join(self.mp3_folder, 'pad.mp3'))
+        info = mp3.get_info()
+        self.assertEqual(info.vbr_header, 'Info')
+        self.assertEqual(info.frames, 41)
+        self.assertAlmostEqual(mp3.get_duration(), (41 * 1152 - 576 - 780) /
+                               44100)
+
+    def test_vbri(self):
+        frame = b'\xff\xfb\x90\x64' + bytes(32)
+        frame += b'VBRI' + bytes(6) + (41700).to_bytes(4, 'big')
+        frame += (100).to_bytes(4, 'big')
+        frame = frame.ljust(417, b'\x00')
+        info = Mp3(self._write_audio(frame * 100)).get_info()
+        self.assertEqual(info.vbr_header, 'VBRI')
+        self.assertEqual(info.frames, 100)
+        self.assertAlmostEqual(info.duration, 100 * 1152 / 44100)
+
+    def test_cbr_estimation(self):
+        frame = b'\xff\xfb\x90\x64'.ljust(417, b'\x55')
+        tags = b'TAG' + bytes(125)
+        mp3 = Mp3(self._write_audio(b'garbage\xff' + frame * 100, tags))
+        info = mp3.get_info()
+        self.assertIsNone(info.vbr_header)
+        self.assertEqual(info.bitrate, 128000)
+        self.assertEqual(info.frames, 100)
+        self.assertAlmostEqual(info.duration, 41700 * 8 / 128000, places=2)
+
+    def test_no_audio(self):
+        mp3 = Mp3(self._write_audio(b'\xff' * 10))
+        self.assertRaises(ValueError, mp3.get_info)
@@ -2,6 +2,7 @@ import os
 import tempfile
 import shutil
 import unittest
+from unittest import mock
 
 from pytag import Audio, AudioReader, FormatNotSupportedError
 
@@ -34,6 +35,29 @@ class InterfaceTest(unittest.TestCase):
         self.assertEqual(audio.genre, 'test')
         self.assertEqual(audio.tracknumber, None)
 
+    def test_read_lazy_fields(self):
+        path = os.path.join(os.path.dirname(__file__),
+                            'files', 'oggvorbis', 'sample.ogg')
+
+        audio = AudioReader(path)
+        with mock.patch.object(audio._format, 'get_tags',
+                               wraps=audio._format.get_tags) as get_tags:
+            self.assertEqual(audio.artist, 'test')
+            self.assertEqual(audio.artist, 'test')
+            self.assertEqual(audio.date, None)
+        self.assertEqual(get_tags.call_args_list,
+                         [mock.call(fields=('artist', )),
+                          mock.call(fields=('date', ))])
+
+    def test_read_fields_case(self):
+        folder = os.path.join(os.path.dirname(__file__), 'files')
+        for name, artist in (('oggvorbis/sample.ogg', 'test'),
+                             ('mp3/pad.mp3', 'Jake Bugg')):
+            audio = AudioReader(os.path.join(folder, name))
+            self.assertEqual(audio.get_tags(fields=('ARTIST', )),
+                             {'artist': artist})
+            self.assertEqual(audio.__dict__['artist'], artist)
+
     def test_write(self):
         path = os.path.join(os.path.dirname(__file__),
                             'files', 'oggvorbis', 'sample.ogg')
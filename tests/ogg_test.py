@@ -455,3 +455,27 @@ class PacketReaderTest(unittest.TestCase):
         self.assertEqual(b'de', reader.read(2))
         reader.position = 0
         self.assertEqual(b'12', reader.read(2))
+
+    def test_readinto(self):
+        reader = self.get_reader(b'abcde',
+                                 [(2,False), (1,False), (2,True)])
+        buf = bytearray(4)
+        self.assertEqual(reader.readinto(buf), 4)
+        self.assertEqual(buf, b'abcd')
+        self.assertEqual(b'e', reader.read())
+
+    def test_skip(self):
+        reader = self.get_reader(b'abcde12',
+                                 [(2,False), (1,False), (2,True), (2,True)])
+        reader.skip(1)
+        self.assertEqual(b'bc', reader.read(2))
+        reader.skip()
+        self.assertEqual(b'12', reader.read())
+
+    def test_read_packet(self):
+        reader = self.get_reader(b'abcde12',
+                                 [(2,False), (1,False), (2,True), (2,True)])
+        packet = reader.read_packet()
+        self.assertIsInstance(packet, memoryview)
+        self.assertEqual(packet, b'abcde')
+        self.assertEqual(reader.read_packet(), b'12')
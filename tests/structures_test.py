@@ -1,6 +1,6 @@
 import unittest
 
-from pytag.structures import CaseInsensitiveDict, PytagDict
+from pytag.structures import CaseInsensitiveDict, PytagDict, Padding
 
 
 class CaseInsensitiveDictTest(unittest.TestCase):
@@ -164,3 +164,14 @@ class PytagDictTest(unittest.TestCase):
         self.assertEqual(len(cid), 0)
         self.assertFalse('foo' in cid)
         self.assertFalse('bar' in cid)
+
+
+class PaddingTest(unittest.TestCase):
+
+    def test_docstring_example(self):
+        self.assertEqual(Padding(1024)(2000), 1024)
+        self.assertEqual(Padding(percent=10)(2000), 200)
+        self.assertEqual(Padding(1024, percent=10)(2000), 1224)
+
+    def test_no_padding(self):
+        self.assertEqual(Padding()(2000), 0)
@@ -0,0 +1,110 @@
+import errno
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pytag import utils
+from pytag.constants import SYNC_NONE, SYNC_FILE, SYNC_DIRECTORY
+
+
+class CopyStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = os.urandom(100000)
+        fd, self.source = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.data)
+        fd, self.destination = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.source)
+        os.remove(self.destination)
+
+    def copy(self, offset=0, size=None, prefix=b'header', **kwargs):
+        with open(self.source, 'rb') as source,\
+                open(self.destination, 'wb') as destination:
+            destination.write(prefix)
+            source.seek(offset)
+            copied = utils.copy_stream(source, destination, size, **kwargs)
+            self.assertEqual(source.tell(), offset + copied)
+            self.assertEqual(destination.tell(), len(prefix) + copied)
+            destination.write(b'end')
+
+        with open(self.destination, 'rb') as f:
+            return copied, f.read()
+
+    def check_copies(self):
+        copied, data = self.copy()
+        self.assertEqual(copied, len(self.data))
+        self.assertEqual(data, b'header' + self.data + b'end')
+
+        copied, data = self.copy(offset=10, size=50000, buffer_size=1000)
+        self.assertEqual(copied, 50000)
+        self.assertEqual(data, b'header' + self.data[10:50010] + b'end')
+
+    def test_copy(self):
+        self.check_copies()
+
+    def test_copy_in_chunks(self):
+        with mock.patch.object(utils, '_kernel_copies', []):
+            self.check_copies()
+
+    def test_kernel_copy_fails(self):
+
+        def fail(*args):
+            raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+        with mock.patch.object(utils, '_kernel_copies', [fail]):
+            self.check_copies()
+
+    def test_file_like_objects(self):
+        source = io.BytesIO(self.data)
+        destination = io.BytesIO()
+        source.seek(100)
+        self.assertEqual(utils.copy_stream(source, destination, 5000), 5000)
+        self.assertEqual(destination.getvalue(), self.data[100:5100])
+
+
+class ReplaceFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'audio.ogg')
+        with open(self.path, 'wb') as f:
+            f.write(b'old')
+        os.chmod(self.path, 0o640)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replace(self):
+        with utils.replace_file(self.path) as f:
+            self.assertEqual(os.path.dirname(f.name), self.directory)
+            f.write(b'new')
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b'new')
+        self.assertEqual(os.listdir(self.directory), ['audio.ogg'])
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+    def test_error(self):
+        with self.assertRaises(ZeroDivisionError):
+            with utils.replace_file(self.path) as f:
+                f.write(b'new')
+                1 / 0
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b'old')
+        self.assertEqual(os.listdir(self.directory), ['audio.ogg'])
+
+    def test_sync(self):
+        for sync, calls in ((SYNC_NONE, 0), (SYNC_FILE, 1),
+                            (SYNC_DIRECTORY, 2)):
+            with mock.patch('os.fsync') as fsync:
+                with utils.replace_file(self.path, sync) as f:
+                    f.write(b'new')
+            self.assertEqual(fsync.call_count, calls)